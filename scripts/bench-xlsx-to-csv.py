@@ -0,0 +1,545 @@
+#!/usr/bin/env python3
+"""
+Benchmark xlsx-to-csv.py on synthetic workbooks.
+
+Generates workbooks shaped like survey deliveries, converts them with
+convert_xlsx_to_csv and process_directory, and records wall time, throughput
+and peak memory for each case. Results can be saved as a baseline and later
+runs compared against it; regressions make the script exit non-zero.
+
+Workbook shapes:
+  datamap       Wide, ragged variable/label/value-code sheet
+  respondents   Tall respondent-level sheet of codes, weights, dates and open ends
+  many-sheets   Dozens of small tables in one workbook
+  mixed         Columns mixing ints, floats, bools, dates, text, NA strings and blanks
+
+Usage:
+  python scripts/bench-xlsx-to-csv.py                       # small + medium, compare to baseline if present
+  python scripts/bench-xlsx-to-csv.py --save-baseline       # record the current tree as the baseline
+  python scripts/bench-xlsx-to-csv.py --sizes large --modes default,stream,calamine
+
+Options:
+  --sizes LIST        Comma-separated sizes: small, medium, large (default: small,medium)
+  --shapes LIST       Comma-separated workbook shapes (default: all)
+  --modes LIST        Converter settings to run: default, stream, raw, calamine
+                      (default: default,stream). calamine cases are skipped
+                      when python-calamine is not installed
+  --jobs N            Also run process_directory with N workers (default: 1 only)
+  --repeat N          Runs per case; the fastest wall time is kept (default 3)
+  --filter PATTERN    Only run cases whose id matches the glob PATTERN
+  --workdir PATH      Where generated workbooks are cached (default: $TMPDIR/xlsx-to-csv-bench)
+  --output PATH       Results file (default: <workdir>/results.json)
+  --baseline PATH     Baseline to compare against (default:
+                      scripts/bench-xlsx-to-csv.baseline.json)
+  --save-baseline     Write this run's results to the baseline path
+  --threshold PCT     Slowdown or memory growth that counts as a regression (default 20)
+
+The baseline lives next to this script rather than in the workdir, so it
+survives tmp cleanup and can be committed. Timings are machine-specific: record
+it on the machine that will run the comparisons (the results note the
+interpreter, library versions and CPU count, and a mismatch is reported).
+
+Every case runs in a fresh interpreter, so peak RSS is that case's alone and
+import time is excluded from wall time. Nothing needs network access.
+"""
+
+import argparse
+import contextlib
+import datetime
+import fnmatch
+import importlib.util
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+CONVERTER_PATH = Path(__file__).with_name("xlsx-to-csv.py")
+DEFAULT_BASELINE_PATH = Path(__file__).with_name("bench-xlsx-to-csv.baseline.json")
+
+# Bump when the generated workbooks change so cached files are rebuilt
+GENERATOR_VERSION = 1
+SEED = 20240601
+
+SIZES = {"small": 1, "medium": 5, "large": 25}
+DEFAULT_SIZES = ("small", "medium")
+SHAPES = ("datamap", "respondents", "many-sheets", "mixed")
+
+# Converter keyword options for each mode
+MODES = {
+    "default": {},
+    "stream": {"stream": True},
+    "raw": {"raw": True},
+    "calamine": {"engine": "calamine"},
+}
+DEFAULT_MODES = ("default", "stream")
+
+RESULTS_VERSION = 1
+DEFAULT_THRESHOLD = 20.0
+# Differences below these are treated as noise whatever the percentage
+MIN_SECONDS_DELTA = 0.1
+MIN_RSS_DELTA_MB = 5.0
+
+
+# =============================================================================
+# Synthetic workbooks
+# =============================================================================
+
+def workbook_layout(shape: str, scale: int) -> list[tuple[str, int, int]]:
+    """
+    Sheets of a synthetic workbook.
+
+    Returns:
+        List of (sheet name, data rows, columns); every sheet also has a header row
+    """
+    if shape == "datamap":
+        return [("Datamap", 400 * scale, 120)]
+    if shape == "respondents":
+        return [("Respondents", 2_000 * scale, 60)]
+    if shape == "many-sheets":
+        return [(f"Table {i + 1}", 30, 8) for i in range(40 * scale)]
+    if shape == "mixed":
+        return [("Mixed", 1_000 * scale, 24)]
+    raise ValueError(f"Unknown shape: {shape}")
+
+
+def _datamap_rows(rng: random.Random, rows: int, columns: int):
+    value_pairs = (columns - 3) // 2
+    yield ["Variable", "Label", "Type"] + [
+        name for i in range(value_pairs) for name in (f"Value {i + 1}", f"Value Label {i + 1}")
+    ]
+    for i in range(rows):
+        row = [f"Q{i // 10 + 1}r{i % 10 + 1}", f"Question {i + 1} label text", rng.choice(["single", "multi", "numeric", "open"])]
+        # Ragged: most variables have a handful of codes, a few have many
+        codes = min(value_pairs, int(rng.paretovariate(1.2) * 3))
+        for code in range(1, codes + 1):
+            row += [code, f"Answer option {code}"]
+        yield row
+
+
+def _respondent_rows(rng: random.Random, rows: int, columns: int):
+    start = datetime.datetime(2024, 1, 1, 8, 0)
+    yield ["record", "uuid", "weight", "start_date"] + [f"Q{i + 1}" for i in range(columns - 5)] + ["open_end"]
+    for i in range(rows):
+        row = [
+            i + 1,
+            f"{rng.getrandbits(64):016x}",
+            round(rng.uniform(0.2, 3.0), 6),
+            start + datetime.timedelta(minutes=rng.randrange(60 * 24 * 30)),
+        ]
+        # Skip logic leaves whole blocks of codes blank
+        asked = rng.random() < 0.7
+        row += [
+            rng.randint(1, 5) if asked or q % 4 else None
+            for q in range(columns - 5)
+        ]
+        row.append(rng.choice(["", "No comment", f"Free text answer {rng.randrange(1000)}", None]))
+        yield row
+
+
+def _small_table_rows(rng: random.Random, rows: int, columns: int):
+    yield ["Banner"] + [f"Col {i + 1}" for i in range(columns - 1)]
+    for i in range(rows):
+        yield [f"Row {i + 1}"] + [round(rng.random() * 100, 1) for _ in range(columns - 1)]
+
+
+def _mixed_rows(rng: random.Random, rows: int, columns: int):
+    day = datetime.datetime(2023, 6, 1)
+    makers = [
+        lambda: rng.randint(-1000, 1000),
+        lambda: rng.uniform(-1e6, 1e6),
+        lambda: rng.random() < 0.5,
+        lambda: day + datetime.timedelta(days=rng.randrange(365)),
+        lambda: day + datetime.timedelta(seconds=rng.randrange(10**7), microseconds=rng.randrange(1000) * 1000),
+        lambda: f"text {rng.randrange(10**6)}",
+        lambda: rng.choice(["NA", "N/A", "#N/A", "null", "", "-"]),
+        lambda: f"{rng.randrange(10**5):05d}",
+        lambda: rng.choice([rng.randint(1, 9), f"code {rng.randint(1, 9)}"]),
+        lambda: rng.choice(["TRUE", "FALSE", "true", rng.randint(0, 1)]),
+    ]
+    column_makers = [makers[i % len(makers)] for i in range(columns)]
+    blank_rates = [rng.choice([0.0, 0.05, 0.3, 0.9]) for _ in range(columns)]
+    kinds = ["int", "float", "bool", "date", "datetime", "text", "na", "zeros", "mixed", "booltext"]
+    yield [f"{kinds[i % len(kinds)]}_{i}" for i in range(columns)]
+    for _ in range(rows):
+        yield [None if rng.random() < blank else make() for make, blank in zip(column_makers, blank_rates)]
+
+
+ROW_GENERATORS = {
+    "datamap": _datamap_rows,
+    "respondents": _respondent_rows,
+    "many-sheets": _small_table_rows,
+    "mixed": _mixed_rows,
+}
+
+
+def generate_workbook(path: Path, shape: str, scale: int) -> None:
+    """Write a synthetic workbook with openpyxl's write-only mode (deterministic for a given shape/scale)."""
+    from openpyxl import Workbook
+
+    rng = random.Random(f"{SEED}:{shape}:{scale}")
+    workbook = Workbook(write_only=True)
+    for sheet_name, rows, columns in workbook_layout(shape, scale):
+        worksheet = workbook.create_sheet(sheet_name)
+        for row in ROW_GENERATORS[shape](rng, rows, columns):
+            worksheet.append(row)
+
+    # Write then rename so an interrupted run never leaves a truncated cache entry
+    tmp_path = path.with_suffix(".tmp")
+    workbook.save(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def ensure_workbooks(workdir: Path, sizes: list[str], shapes: list[str]) -> dict:
+    """
+    Generate (or reuse cached) workbooks for every size and shape.
+
+    Returns:
+        Dict mapping size -> {shape: workbook path}
+    """
+    workbooks = {}
+    for size in sizes:
+        size_dir = workdir / f"v{GENERATOR_VERSION}" / size
+        size_dir.mkdir(parents=True, exist_ok=True)
+        workbooks[size] = {}
+        for shape in shapes:
+            path = size_dir / f"{shape}.xlsx"
+            if not path.exists():
+                print(f"Generating {size}/{shape}...")
+                started = time.perf_counter()
+                generate_workbook(path, shape, SIZES[size])
+                print(f"  {path.stat().st_size / 1e6:.1f} MB in {time.perf_counter() - started:.1f}s")
+            workbooks[size][shape] = path
+    return workbooks
+
+
+# =============================================================================
+# Running cases
+# =============================================================================
+
+def load_converter():
+    """Import scripts/xlsx-to-csv.py as a module."""
+    spec = importlib.util.spec_from_file_location("xlsx_to_csv", CONVERTER_PATH)
+    module = importlib.util.module_from_spec(spec)
+    # Registered so worker processes can unpickle its functions
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def _peak_rss_mb(who: int) -> float:
+    import resource
+    peak = resource.getrusage(who).ru_maxrss
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def run_case(case: dict) -> dict:
+    """
+    Run one conversion and measure it. Called in a fresh interpreter (--run-case).
+
+    Returns:
+        Dict with "wall_seconds", "peak_rss_mb" and "outputs"
+    """
+    import resource
+
+    converter = load_converter()
+    # Import readers up front so wall time measures conversion only
+    converter.preload_readers()
+    options = case["options"]
+
+    with tempfile.TemporaryDirectory(prefix="xlsx-to-csv-bench-") as tmp:
+        tmp = Path(tmp)
+        sources = [Path(path) for path in case["workbooks"]]
+        if case["function"] == "directory":
+            # process_directory writes next to its inputs, so work on links to the cached files
+            for source in sources:
+                try:
+                    os.link(source, tmp / source.name)
+                except OSError:
+                    shutil.copy2(source, tmp / source.name)
+
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            started = time.perf_counter()
+            if case["function"] == "directory":
+                results = converter.process_directory(tmp, jobs=case["jobs"], force=True, **options)
+                outputs = sum(len(created) for created in results.values())
+            else:
+                outputs = len(converter.convert_xlsx_to_csv(sources[0], output_dir=tmp, **options))
+            wall_seconds = time.perf_counter() - started
+
+    return {
+        "wall_seconds": wall_seconds,
+        "peak_rss_mb": max(_peak_rss_mb(resource.RUSAGE_SELF), _peak_rss_mb(resource.RUSAGE_CHILDREN)),
+        "outputs": outputs,
+    }
+
+
+def build_cases(workbooks: dict, modes: list[str], jobs: int, pattern: str = None) -> list[dict]:
+    """Expand sizes x shapes x modes into case descriptions (convert per workbook, directory per size)."""
+    job_counts = [1] if jobs <= 1 else [1, jobs]
+    cases = []
+    for size, by_shape in workbooks.items():
+        for mode in modes:
+            for shape, path in by_shape.items():
+                cases.append({
+                    "id": f"convert/{shape}/{size}/{mode}",
+                    "function": "convert",
+                    "workbooks": [str(path)],
+                    "options": MODES[mode],
+                    "layouts": [workbook_layout(shape, SIZES[size])],
+                })
+            for job_count in job_counts:
+                cases.append({
+                    "id": f"directory/all/{size}/{mode}-j{job_count}",
+                    "function": "directory",
+                    "workbooks": [str(path) for path in by_shape.values()],
+                    "options": MODES[mode],
+                    "jobs": job_count,
+                    "layouts": [workbook_layout(shape, SIZES[size]) for shape in by_shape],
+                })
+    if pattern:
+        cases = [case for case in cases if fnmatch.fnmatchcase(case["id"], pattern)]
+    return cases
+
+
+def measure_case(case: dict, repeat: int) -> dict:
+    """
+    Run a case `repeat` times, each in its own interpreter.
+
+    Returns:
+        Result record: fastest wall time, all wall times, peak RSS, and throughput
+    """
+    runs = []
+    for _ in range(repeat):
+        child = case | {"layouts": None}
+        proc = subprocess.run(
+            [sys.executable, __file__, "--run-case", json.dumps(child)],
+            capture_output=True,
+            text=True,
+        )
+        if proc.returncode != 0:
+            error = (proc.stderr.strip().splitlines() or ["exit code %d" % proc.returncode])[-1]
+            return {"error": error}
+        runs.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+
+    rows = sum(rows for layout in case["layouts"] for _, rows, _ in layout)
+    cells = sum(rows * columns for layout in case["layouts"] for _, rows, columns in layout)
+    input_bytes = sum(os.path.getsize(path) for path in case["workbooks"])
+    wall_seconds = min(run["wall_seconds"] for run in runs)
+    return {
+        "wall_seconds": round(wall_seconds, 6),
+        "wall_seconds_runs": [round(run["wall_seconds"], 6) for run in runs],
+        "peak_rss_mb": round(max(run["peak_rss_mb"] for run in runs), 1),
+        "rows": rows,
+        "cells": cells,
+        "input_bytes": input_bytes,
+        "outputs": runs[0]["outputs"],
+        "rows_per_sec": round(rows / wall_seconds, 1),
+        "cells_per_sec": round(cells / wall_seconds, 1),
+        "input_mb_per_sec": round(input_bytes / 1e6 / wall_seconds, 3),
+    }
+
+
+def environment() -> dict:
+    """Interpreter and library versions, so results from different setups are not compared blindly."""
+    versions = {}
+    for package in ("pandas", "openpyxl", "pyarrow", "python_calamine"):
+        try:
+            module = importlib.import_module(package)
+            versions[package] = getattr(module, "__version__", "unknown")
+        except ImportError:
+            versions[package] = None
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "packages": versions,
+    }
+
+
+# =============================================================================
+# Baseline comparison
+# =============================================================================
+
+def compare_results(results: dict, baseline: dict, threshold: float) -> list[dict]:
+    """
+    Compare case results with a baseline.
+
+    A case regresses when its wall time or peak RSS grows by more than
+    `threshold` percent and by more than the noise floors.
+
+    Returns:
+        One row per case present in both, with "metric" deltas and a "regressed" flag
+    """
+    rows = []
+    limit = 1 + threshold / 100
+    for case_id, result in results["cases"].items():
+        before = baseline["cases"].get(case_id)
+        if before is None or "error" in before or "error" in result:
+            continue
+        time_ratio = result["wall_seconds"] / before["wall_seconds"] if before["wall_seconds"] else 1.0
+        rss_ratio = result["peak_rss_mb"] / before["peak_rss_mb"] if before["peak_rss_mb"] else 1.0
+        slower = (
+            time_ratio > limit
+            and result["wall_seconds"] - before["wall_seconds"] > MIN_SECONDS_DELTA
+        )
+        bigger = (
+            rss_ratio > limit
+            and result["peak_rss_mb"] - before["peak_rss_mb"] > MIN_RSS_DELTA_MB
+        )
+        rows.append({
+            "id": case_id,
+            "wall_seconds": (before["wall_seconds"], result["wall_seconds"]),
+            "peak_rss_mb": (before["peak_rss_mb"], result["peak_rss_mb"]),
+            "time_change": time_ratio - 1,
+            "rss_change": rss_ratio - 1,
+            "regressed": [metric for metric, flag in (("time", slower), ("memory", bigger)) if flag],
+        })
+    return rows
+
+
+def print_comparison(rows: list[dict]) -> None:
+    print(f"\n{'case':<44} {'base s':>8} {'now s':>8} {'Δtime':>7} {'base MB':>8} {'now MB':>8} {'Δmem':>7}")
+    for row in rows:
+        flag = "  REGRESSION (" + ", ".join(row["regressed"]) + ")" if row["regressed"] else ""
+        print(
+            f"{row['id']:<44} {row['wall_seconds'][0]:>8.3f} {row['wall_seconds'][1]:>8.3f} "
+            f"{row['time_change']:>+7.1%} {row['peak_rss_mb'][0]:>8.1f} {row['peak_rss_mb'][1]:>8.1f} "
+            f"{row['rss_change']:>+7.1%}{flag}"
+        )
+
+
+def _write_json(data: dict, path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+        f.write("\n")
+    os.replace(tmp_path, path)
+
+
+# =============================================================================
+# CLI
+# =============================================================================
+
+def _list_arg(choices):
+    def parse(value: str) -> list[str]:
+        items = [item.strip() for item in value.split(",") if item.strip()]
+        unknown = [item for item in items if item not in choices]
+        if unknown or not items:
+            raise argparse.ArgumentTypeError(
+                f"expected a comma-separated list of {', '.join(choices)}"
+            )
+        return items
+    return parse
+
+
+def parse_args(argv: list[str] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark xlsx-to-csv.py on synthetic workbooks.")
+    parser.add_argument("--sizes", type=_list_arg(list(SIZES)), default=list(DEFAULT_SIZES),
+                        help="Comma-separated sizes: small, medium, large (default: small,medium)")
+    parser.add_argument("--shapes", type=_list_arg(SHAPES), default=list(SHAPES),
+                        help="Comma-separated workbook shapes (default: all)")
+    parser.add_argument("--modes", type=_list_arg(list(MODES)), default=list(DEFAULT_MODES),
+                        help="Converter settings: default, stream, raw, calamine (default: default,stream)")
+    parser.add_argument("--jobs", type=int, default=1,
+                        help="Also run process_directory with N workers (default: 1 only)")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="Runs per case; the fastest is kept (default 3)")
+    parser.add_argument("--filter", metavar="PATTERN", help="Only run cases whose id matches this glob")
+    parser.add_argument("--workdir", type=Path,
+                        default=Path(tempfile.gettempdir()) / "xlsx-to-csv-bench",
+                        help="Where generated workbooks are cached")
+    parser.add_argument("--output", type=Path, help="Results file (default: <workdir>/results.json)")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE_PATH,
+                        help="Baseline file (default: scripts/bench-xlsx-to-csv.baseline.json)")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="Write this run's results to the baseline path")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, metavar="PCT",
+                        help="Percent slowdown or memory growth flagged as a regression (default 20)")
+    parser.add_argument("--run-case", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    if args.repeat < 1:
+        parser.error("--repeat must be at least 1")
+    if args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+    args.output = args.output or args.workdir / "results.json"
+    return args
+
+
+def main():
+    args = parse_args()
+
+    if args.run_case:
+        print(json.dumps(run_case(json.loads(args.run_case))))
+        return
+
+    modes = list(args.modes)
+    if "calamine" in modes and importlib.util.find_spec("python_calamine") is None:
+        print("Skipping calamine cases: python-calamine is not installed")
+        modes.remove("calamine")
+
+    workbooks = ensure_workbooks(args.workdir, args.sizes, args.shapes)
+    cases = build_cases(workbooks, modes, args.jobs, args.filter)
+    if not cases:
+        print("No cases to run")
+        sys.exit(1)
+
+    results = {
+        "version": RESULTS_VERSION,
+        "generator_version": GENERATOR_VERSION,
+        "generated_at": datetime.datetime.now().isoformat(timespec="seconds"),
+        "environment": environment(),
+        "repeat": args.repeat,
+        "cases": {},
+    }
+    print(f"\nRunning {len(cases)} cases x {args.repeat}\n")
+    print(f"{'case':<44} {'wall s':>8} {'rows/s':>10} {'MB/s':>7} {'peak MB':>8}")
+    for case in cases:
+        result = results["cases"][case["id"]] = measure_case(case, args.repeat)
+        if "error" in result:
+            print(f"{case['id']:<44} ERROR: {result['error']}")
+        else:
+            print(
+                f"{case['id']:<44} {result['wall_seconds']:>8.3f} {result['rows_per_sec']:>10.0f} "
+                f"{result['input_mb_per_sec']:>7.2f} {result['peak_rss_mb']:>8.1f}"
+            )
+
+    _write_json(results, args.output)
+    print(f"\nResults written: {args.output}")
+
+    failed = [case_id for case_id, result in results["cases"].items() if "error" in result]
+    regressions = []
+    if args.save_baseline:
+        _write_json(results, args.baseline)
+        print(f"Baseline written: {args.baseline}")
+    elif args.baseline.exists():
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("generator_version") != GENERATOR_VERSION:
+            print(f"Baseline was recorded with generator v{baseline.get('generator_version')}; "
+                  f"re-record it with --save-baseline")
+        else:
+            if baseline.get("environment") != results["environment"]:
+                print("Note: baseline was recorded in a different environment; differences may not be the code's")
+            rows = compare_results(results, baseline, args.threshold)
+            print_comparison(rows)
+            regressions = [row["id"] for row in rows if row["regressed"]]
+            print(f"\n{len(regressions)} regressions over {args.threshold:g}% across {len(rows)} compared cases")
+    else:
+        print(f"No baseline at {args.baseline}; record one with --save-baseline")
+
+    if failed:
+        print(f"{len(failed)} cases failed: {', '.join(failed)}")
+    if failed or regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
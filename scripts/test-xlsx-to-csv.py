@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+"""
+Checks for xlsx-to-csv.py on small generated workbooks.
+
+Verifies:
+1. --stream writes byte-identical CSVs to the default pandas path on sheets
+   exercising pandas' dtype inference (blanks, bools with NaN or mixed with
+   "TRUE"/"FALSE" text, error cells,
+   big ints, leading blank rows, duplicate/Unnamed headers, datetimes)
+2. --raw keeps values as stored (leading zeros, "NA" text, integer codes with
+   blanks) where the default output applies pandas' inference
+3. --raw output is the same from the pandas path and --stream, and from the
+   openpyxl and calamine readers (skipped when python-calamine is missing)
+4. Parquet and Arrow files have the same schema with and without --stream
+   (skipped when pyarrow is missing)
+5. Folder runs use the manifest: unchanged and touched-but-identical workbooks
+   are skipped, outputs of removed sheets are deleted, --sheets and --format
+   reruns keep the other outputs, a failed conversion keeps its outputs on
+   record, and outputs of removed workbooks go only with --prune
+6. A workbook is reconverted when a different reader would run now (calamine
+   installed since, or --engine auto crossing its size threshold), and skipped
+   again afterwards (skipped when python-calamine is missing)
+
+Usage: python scripts/test-xlsx-to-csv.py
+"""
+
+import contextlib
+import datetime
+import importlib.util
+import io
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+from openpyxl import Workbook
+
+spec = importlib.util.spec_from_file_location("xlsx_to_csv", Path(__file__).with_name("xlsx-to-csv.py"))
+converter = importlib.util.module_from_spec(spec)
+sys.modules[spec.name] = converter
+spec.loader.exec_module(converter)
+
+failures = []
+
+
+def check(name: str, ok: bool, detail: str = "") -> None:
+    print(f"  {name}: {'PASS ✓' if ok else 'FAIL ✗'}{'  ' + detail if detail and not ok else ''}")
+    if not ok:
+        failures.append(name)
+
+
+# =============================================================================
+# Workbooks
+# =============================================================================
+
+def build_inference_workbook(path: Path) -> None:
+    """One sheet per inference edge case, so each column's dtype is decided by that case alone."""
+    workbook = Workbook()
+    workbook.remove(workbook.active)
+
+    def sheet(name: str, rows: list[list]) -> None:
+        worksheet = workbook.create_sheet(name)
+        for row in rows:
+            worksheet.append(row)
+
+    sheet("blanks", [
+        ["int", "float", "text", "empty"],
+        [1, 1.5, "a", None],
+        [None, None, None, None],
+        [3, 2.0, "c", None],
+    ])
+    sheet("bools", [
+        ["bool", "bool_nan", "bool_num", "bool_text", "bool_mixed", "bool_mixed_nan"],
+        [True, True, True, "TRUE", True, True],
+        [False, None, 2, "false", "TRUE", "FALSE"],
+        [True, False, 3.5, None, False, None],
+    ])
+    sheet("errors", [
+        ["value", "error"],
+        [1, "#N/A"],
+        [2, "#DIV/0!"],
+        ["#VALUE!", "#REF!"],
+    ])
+    sheet("bigints", [
+        ["int64", "too_big", "float_big", "integral_float"],
+        [2**62, 2**70, 1.5, 3.0],
+        [-(2**62), 1, 1e20, 4.0],
+    ])
+    sheet("na_text", [
+        ["na", "leading_zero", "codes"],
+        ["NA", "007", 1],
+        ["N/A", "010", "2"],
+        ["x", None, 3],
+    ])
+    sheet("headers", [
+        ["a", None, "a", "b", "b", None],
+        [1, 2, 3, 4, 5, 6],
+        [7, 8, 9, 10, 11, 12],
+    ])
+    leading = workbook.create_sheet("leading_blank_rows")
+    leading.cell(row=3, column=2, value="x")
+    leading.cell(row=3, column=3, value="y")
+    leading.cell(row=4, column=2, value=1)
+    leading.cell(row=4, column=3, value="z")
+    leading.cell(row=7, column=2, value=None)
+    sheet("dates", [
+        ["date", "datetime", "millis", "mixed"],
+        [datetime.datetime(2024, 1, 1), datetime.datetime(2024, 1, 1, 9, 30), datetime.datetime(2024, 1, 1, 0, 0, 0, 123000), datetime.datetime(2024, 1, 1)],
+        [datetime.datetime(2024, 2, 29), datetime.datetime(2024, 2, 29, 23, 59, 59), datetime.datetime(2024, 1, 2), "later"],
+        [None, None, None, None],
+        [datetime.datetime(1999, 12, 31), None, datetime.datetime(2024, 1, 3, 1, 2, 3, 4000), 5],
+    ])
+    sheet("ragged", [
+        ["a", "b"],
+        [1],
+        [1, 2, 3, 4],
+        [None, None, None, None, "far"],
+    ])
+    workbook.create_sheet("empty")
+    workbook.save(path)
+
+
+def build_raw_workbook(path: Path) -> None:
+    """A respondent-style sheet whose stored values pandas' inference would rewrite."""
+    workbook = Workbook()
+    worksheet = workbook.active
+    worksheet.title = "Data"
+    for row in [
+        ["record", "zip", "status", "q1", "weight", "when", "flag"],
+        [1, "00501", "NA", 1, 1.25, datetime.datetime(2024, 1, 2), True],
+        [2, "02134", "complete", None, 0.5, datetime.datetime(2024, 1, 2, 13, 45), False],
+        [3, "10001", "N/A", 3, 2, None, None],
+        [4, None, "", 2, 1e-7, datetime.datetime(2024, 3, 1), "TRUE"],
+    ]:
+        worksheet.append(row)
+    workbook.save(path)
+
+
+# =============================================================================
+# Checks
+# =============================================================================
+
+def convert(*args, **kwargs) -> list[str]:
+    """convert_xlsx_to_csv with its per-file progress output silenced."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return converter.convert_xlsx_to_csv(*args, **kwargs)
+
+
+def read_outputs(paths: list[str]) -> dict:
+    return {Path(path).name: Path(path).read_bytes() for path in paths}
+
+
+def compare_outputs(name: str, expected: dict, actual: dict) -> None:
+    check(f"{name}: same files", sorted(expected) == sorted(actual), f"{sorted(expected)} vs {sorted(actual)}")
+    for file_name in sorted(expected):
+        if file_name in actual:
+            check(
+                f"{name}: {file_name}",
+                expected[file_name] == actual[file_name],
+                f"\n    expected {expected[file_name]!r}\n    actual   {actual[file_name]!r}",
+            )
+
+
+def check_stream_parity(tmp: Path) -> None:
+    print("Stream parity (default vs --stream)")
+    workbook = tmp / "inference.xlsx"
+    build_inference_workbook(workbook)
+    default = convert(workbook, output_dir=tmp / "default")
+    stream = convert(workbook, output_dir=tmp / "stream", stream=True, chunk_size=2)
+    compare_outputs("stream", read_outputs(default), read_outputs(stream))
+
+
+def check_raw(tmp: Path) -> None:
+    print("\nRaw values (--raw vs default)")
+    workbook = tmp / "codes.xlsx"
+    build_raw_workbook(workbook)
+    default = read_outputs(convert(workbook, output_dir=tmp / "raw-default"))["codes__Data.csv"].decode()
+    raw = read_outputs(convert(workbook, output_dir=tmp / "raw-raw", raw=True))["codes__Data.csv"].decode()
+    default_rows = [line.split(",") for line in default.splitlines()]
+    raw_rows = [line.split(",") for line in raw.splitlines()]
+    column = {name: i for i, name in enumerate(raw_rows[0])}
+
+    def values(rows: list[list[str]], name: str) -> list[str]:
+        return [row[column[name]] for row in rows[1:]]
+
+    check("default drops leading zeros", values(default_rows, "zip") == ["501.0", "2134.0", "10001.0", ""],
+          str(values(default_rows, "zip")))
+    check("raw keeps leading zeros", values(raw_rows, "zip") == ["00501", "02134", "10001", ""],
+          str(values(raw_rows, "zip")))
+    check("default blanks NA text", values(default_rows, "status")[0] == "", str(values(default_rows, "status")))
+    check("raw keeps NA text", values(raw_rows, "status") == ["NA", "complete", "N/A", ""],
+          str(values(raw_rows, "status")))
+    check("default floats codes with blanks", values(default_rows, "q1") == ["1.0", "", "3.0", "2.0"],
+          str(values(default_rows, "q1")))
+    check("raw keeps integer codes", values(raw_rows, "q1") == ["1", "", "3", "2"], str(values(raw_rows, "q1")))
+
+    print("\nRaw parity (pandas vs --stream, openpyxl vs calamine)")
+    inference = tmp / "inference.xlsx"
+    if not inference.exists():
+        build_inference_workbook(inference)
+    for source in (workbook, inference):
+        expected = read_outputs(convert(source, output_dir=tmp / f"raw-pandas-{source.stem}", raw=True))
+        stream = read_outputs(convert(source, output_dir=tmp / f"raw-stream-{source.stem}", raw=True, stream=True))
+        compare_outputs(f"raw stream {source.stem}", expected, stream)
+        if not converter.engine_available("calamine"):
+            print(f"  raw calamine {source.stem}: SKIP (python-calamine not installed)")
+            continue
+        calamine = read_outputs(convert(source, output_dir=tmp / f"raw-calamine-{source.stem}", raw=True, engine="calamine"))
+        compare_outputs(f"raw calamine {source.stem}", expected, calamine)
+
+
+def check_columnar_schema(tmp: Path) -> None:
+    print("\nColumnar schema (default vs --stream)")
+    if importlib.util.find_spec("pyarrow") is None:
+        print("  columnar: SKIP (pyarrow not installed)")
+        return
+    import pyarrow.ipc as ipc
+    import pyarrow.parquet as pq
+
+    def schemas(paths: list[str]) -> dict:
+        read = {".parquet": pq.read_schema, ".arrow": lambda path: ipc.open_file(path).schema}
+        return {
+            Path(path).name: [(field.name, str(field.type)) for field in read[Path(path).suffix](path)]
+            for path in paths
+        }
+
+    inference = tmp / "inference.xlsx"
+    if not inference.exists():
+        build_inference_workbook(inference)
+    for raw in (False, True):
+        options = {"formats": "parquet,arrow", "raw": raw}
+        default = schemas(convert(inference, output_dir=tmp / f"columnar-default-{raw}", **options))
+        stream = schemas(convert(inference, output_dir=tmp / f"columnar-stream-{raw}", stream=True, **options))
+        check(f"columnar{' raw' if raw else ''}: same files", sorted(default) == sorted(stream))
+        for name in sorted(default):
+            check(f"columnar{' raw' if raw else ''}: {name}", default[name] == stream.get(name),
+                  f"\n    default {default[name]}\n    stream  {stream.get(name)}")
+
+
+def build_sheets_workbook(path: Path, sheet_names: list[str]) -> None:
+    workbook = Workbook()
+    workbook.remove(workbook.active)
+    for name in sheet_names:
+        workbook.create_sheet(name).append(["sheet", name])
+    workbook.save(path)
+
+
+def check_manifest(tmp: Path) -> None:
+    print("\nIncremental manifest (folder runs)")
+    folder = tmp / "manifest"
+    folder.mkdir()
+    workbook = folder / "study.xlsx"
+    build_sheets_workbook(workbook, ["A", "B", "C"])
+
+    def run(**kwargs) -> str:
+        details = {}
+        with contextlib.redirect_stdout(io.StringIO()):
+            converter.process_directory(folder, jobs=1, details=details, **kwargs)
+        return details[str(workbook)]["status"]
+
+    def outputs() -> list[str]:
+        return sorted(path.name for path in folder.iterdir() if path.name.startswith("study__"))
+
+    check("first run converts", run() == "ok")
+    check("unchanged rerun is skipped", run() == "skipped")
+
+    stat = workbook.stat()
+    os.utime(workbook, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    check("touched but identical is skipped", run() == "skipped")
+
+    build_sheets_workbook(workbook, ["A", "B"])
+    check("changed workbook converts", run() == "ok")
+    check("removed sheet's CSV is deleted", outputs() == ["study__A.csv", "study__B.csv"], str(outputs()))
+
+    check("--sheets rerun converts", run(include_sheets=["A"]) == "ok")
+    check("--sheets keeps other sheets' CSVs", outputs() == ["study__A.csv", "study__B.csv"], str(outputs()))
+
+    if importlib.util.find_spec("pyarrow") is None:
+        print("  --format parquet rerun: SKIP (pyarrow not installed)")
+    else:
+        check("--format parquet rerun converts", run(formats="parquet") == "ok")
+        expected = ["study__A.csv", "study__A.parquet", "study__B.csv", "study__B.parquet"]
+        check("--format parquet keeps the CSVs", outputs() == expected, str(outputs()))
+        (folder / "study__A.parquet").unlink()
+        (folder / "study__B.parquet").unlink()
+
+    workbook.write_bytes(b"not a workbook")
+    check("unreadable workbook fails", run() == "error")
+    build_sheets_workbook(workbook, ["A"])
+    check("rerun after a failure converts", run() == "ok")
+    check("failed run keeps outputs on record", outputs() == ["study__A.csv"], str(outputs()))
+
+    workbook.unlink()
+    with contextlib.redirect_stdout(io.StringIO()):
+        converter.process_directory(folder, jobs=1)
+    check("removed workbook's outputs kept without --prune", outputs() == ["study__A.csv"], str(outputs()))
+    with contextlib.redirect_stdout(io.StringIO()):
+        converter.process_directory(folder, jobs=1, prune=True)
+    check("removed workbook's outputs deleted with --prune", outputs() == [], str(outputs()))
+
+
+def check_engine_manifest(tmp: Path) -> None:
+    print("\nReader changes (folder runs)")
+    if not converter.engine_available("calamine"):
+        print("  reader changes: SKIP (python-calamine not installed)")
+        return
+    folder = tmp / "engines"
+    folder.mkdir()
+    workbook = folder / "study.xlsx"
+    build_sheets_workbook(workbook, ["A"])
+
+    def run(**kwargs) -> dict:
+        details = {}
+        with contextlib.redirect_stdout(io.StringIO()):
+            converter.process_directory(folder, jobs=1, details=details, **kwargs)
+        return details[str(workbook)]
+
+    engine_available = converter.engine_available
+    converter.engine_available = lambda engine: engine == "openpyxl"
+    try:
+        check("calamine missing: openpyxl runs", run(engine="calamine").get("engine") == "openpyxl")
+    finally:
+        converter.engine_available = engine_available
+    result = run(engine="calamine")
+    check("calamine installed since: reconverted", (result["status"], result.get("engine")) == ("ok", "calamine"),
+          str(result))
+    check("calamine installed since: then skipped", run(engine="calamine")["status"] == "skipped")
+
+    result = run(engine="auto")
+    check("auto on a small workbook: openpyxl", (result["status"], result.get("engine")) == ("ok", "openpyxl"),
+          str(result))
+    check("auto on a small workbook: then skipped", run(engine="auto")["status"] == "skipped")
+    threshold = converter.AUTO_CALAMINE_MIN_BYTES
+    converter.AUTO_CALAMINE_MIN_BYTES = 0
+    try:
+        result = run(engine="auto")
+        check("auto on a large workbook: calamine", (result["status"], result.get("engine")) == ("ok", "calamine"),
+              str(result))
+    finally:
+        converter.AUTO_CALAMINE_MIN_BYTES = threshold
+
+
+def main():
+    print("=== xlsx-to-csv checks ===\n")
+    with tempfile.TemporaryDirectory(prefix="xlsx-to-csv-test-") as tmp:
+        check_stream_parity(Path(tmp))
+        check_raw(Path(tmp))
+        check_columnar_schema(Path(tmp))
+        check_manifest(Path(tmp))
+        check_engine_manifest(Path(tmp))
+
+    print(f"\n{'All checks passed' if not failures else f'{len(failures)} checks failed'}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -9,100 +9,1893 @@ Usage:
   python scripts/xlsx-to-csv.py                    # Process all xlsx in data/test-data
   python scripts/xlsx-to-csv.py path/to/folder    # Process all xlsx in specified folder
   python scripts/xlsx-to-csv.py path/to/file.xlsx # Process single file
+
+Options:
+  --stream            Read rows lazily and write CSVs in bounded chunks
+                      (constant memory, for very large sheets). Each sheet's
+                      XML is read twice, so it is slower than the default
+                      (roughly 1.5x) and only worth it when memory is tight
+  --chunk-size N      Rows buffered per write in --stream mode (default 10000)
+  --jobs N            Worker processes for folder conversion (default: CPU count)
+  --split-sheets      Also spread the sheets of each workbook across workers
+  --force             Reconvert every workbook, ignoring the incremental manifest
+  --prune             Also delete the outputs of workbooks that were removed
+                      from the folder since the last run
+  --engine NAME       Reader: openpyxl (default), calamine, or auto (calamine
+                      for workbooks of 2 MiB or more when installed, openpyxl
+                      for smaller ones; calamine falls back to openpyxl per
+                      workbook)
+  --raw               Write cell values as stored, skipping pandas type inference
+                      (keeps leading zeros, "NA" text, and integer codes as 1)
+  --format LIST       Comma-separated outputs: csv (default), parquet, arrow.
+                      Columnar files keep column types and record the sheet name
+                      and source workbook in their schema metadata (needs pyarrow)
+  --sheets PATTERN    Only convert sheets matching PATTERN (repeatable). Patterns
+                      are case-insensitive globs, or regexes prefixed with "re:"
+  --exclude-sheets PATTERN
+                      Skip sheets matching PATTERN (repeatable)
+  --list              Print each workbook's sheets and declared dimensions
+                      without reading any cell data, then exit
+  --watch             Keep running and reconvert the folder whenever its
+                      workbooks change (polls every --interval seconds)
+  --serve             Run as a warm worker: read JSON-line jobs from stdin and
+                      write one JSON-line result per job to stdout
+  --socket PATH       Like --serve, but accept jobs on a Unix socket
+  --report PATH       Write per-file and per-sheet timings (parse/convert/write
+                      seconds, rows, bytes, rows/sec, peak RSS) and per-file
+                      manifest check/record seconds as JSON
+  --top N             Print the N slowest sheets after the run (default 10
+                      with --report)
+
+Folder runs are incremental: each output folder keeps a manifest
+(.xlsx-to-csv-manifest.json) of source size/mtime/hash and the CSVs produced,
+so unchanged workbooks are skipped and CSVs for removed sheets are deleted.
+Outputs of workbooks that disappear are kept unless --prune is given.
+
+Jobs sent to --serve/--socket are JSON objects, one per line:
+  {"id": 1, "path": "data/study.xlsx", "sheets": ["*datamap*"], "raw": true}
+  {"id": 2, "path": "data/test-data", "force": true}
+  {"op": "ping"} / {"op": "shutdown"}
+Any conversion option may be given using its keyword name; "sheets" is accepted
+as an alias for include_sheets.
 """
 
+import argparse
+import contextlib
+import csv
+import datetime
+import fnmatch
+import hashlib
+import importlib.util
+import inspect
+import io
+import json
+import re
+import socket
+import socketserver
 import sys
 import os
 import glob
+import posixpath
+import threading
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+from stat import S_ISSOCK
+from xml.etree import ElementTree
+
+# pandas is imported on first use so runs with nothing to convert start fast
+pd = None
+
+
+def require_pandas():
+    """Import pandas and return the module, with an actionable error if it is missing."""
+    global pd
+    if pd is None:
+        try:
+            import pandas
+        except ImportError:
+            raise ImportError("xlsx-to-csv needs pandas and openpyxl (pip install pandas openpyxl)") from None
+        pd = pandas
+    return pd
+
+
+def require_pyarrow():
+    """Import pyarrow for columnar output, with an actionable error if it is missing."""
+    try:
+        import pyarrow
+    except ImportError:
+        raise ImportError("parquet/arrow output needs pyarrow (pip install pyarrow)") from None
+    return pyarrow
+
+
+# Output formats accepted by --format, with their file extensions
+OUTPUT_FORMATS = {"csv": ".csv", "parquet": ".parquet", "arrow": ".arrow"}
+DEFAULT_FORMATS = ("csv",)
+
+# Readers accepted by --engine; "auto" picks one per workbook (see candidate_engines)
+ENGINES = ("openpyxl", "calamine", "auto")
+DEFAULT_ENGINE = "openpyxl"
+
+# Smallest workbook (on disk) that --engine auto reads with calamine. Below it,
+# openpyxl's parse time is small next to the rest of a conversion, so auto keeps
+# the default reader's output there
+AUTO_CALAMINE_MIN_BYTES = 2 * 1024 * 1024
+
+# Rows buffered between writes in streaming mode
+STREAM_CHUNK_ROWS = 10_000
+
+# Strings pandas treats as missing when reading a sheet (pandas' STR_NA_VALUES)
+NA_STRINGS = frozenset({
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan",
+    "1.#IND", "1.#QNAN", "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a",
+    "nan", "null",
+})
+
+BOOL_STRINGS = {"True": True, "TRUE": True, "true": True,
+                "False": False, "FALSE": False, "false": False}
+
+INT_PATTERN = re.compile(r"\s*[+-]?\d+\s*")
+FLOAT_PATTERN = re.compile(
+    r"\s*[+-]?(?:(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?|inf(?:inity)?)\s*",
+    re.IGNORECASE,
+)
+
+INT64_MIN, INT64_MAX = -(2**63), 2**63 - 1
+
+# Column kinds resolved by the streaming pre-scan (mirror pandas' dtypes)
+KIND_EMPTY, KIND_INT, KIND_FLOAT, KIND_BOOL, KIND_DATETIME, KIND_OBJECT = range(6)
+
+# Value classes seen while scanning a column
+_NA, _INT, _BIGINT, _FLOAT, _BOOL, _BOOL_TEXT, _DATETIME, _TEXT = range(8)
+
+
+def parse_formats(value) -> tuple[str, ...]:
+    """Normalize a comma-separated string (or sequence) of output formats."""
+    if isinstance(value, str):
+        value = value.split(",")
+    formats = tuple(dict.fromkeys(f.strip().lower() for f in value if f.strip()))
+    unknown = [f for f in formats if f not in OUTPUT_FORMATS]
+    if unknown or not formats:
+        raise ValueError(
+            f"Unknown output format {', '.join(unknown) or '(none)'}; "
+            f"expected any of {', '.join(OUTPUT_FORMATS)}"
+        )
+    return formats
+
+
+def sheet_output_path(output_dir: Path, base_name: str, sheet_name: str, fmt: str = "csv") -> Path:
+    """Build the output path for a sheet: basename__sheetname.csv (or .parquet/.arrow)"""
+    # Sanitize sheet name for filename
+    safe_sheet_name = sheet_name.replace("/", "-").replace("\\", "-").replace(" ", "_")
+    return output_dir / f"{base_name}__{safe_sheet_name}{OUTPUT_FORMATS[fmt]}"
+
+
+def sheet_matches(sheet_name: str, pattern: str) -> bool:
+    """Match a sheet name against a case-insensitive glob, or a regex prefixed with "re:"."""
+    if pattern.startswith("re:"):
+        return re.search(pattern[3:], sheet_name) is not None
+    return fnmatch.fnmatchcase(sheet_name.lower(), pattern.lower())
+
+
+def select_sheets(sheet_names: list[str], include: list[str] = None, exclude: list[str] = None) -> list[str]:
+    """
+    Filter sheet names, keeping workbook order.
+
+    Args:
+        sheet_names: Candidate sheet names
+        include: Keep only sheets matching at least one of these patterns (default: all)
+        exclude: Drop sheets matching any of these patterns
+
+    Returns:
+        Selected sheet names
+    """
+    return [
+        name for name in sheet_names
+        if (not include or any(sheet_matches(name, p) for p in include))
+        and not any(sheet_matches(name, p) for p in exclude or ())
+    ]
+
+
+def sheet_metadata(xlsx_path: Path, sheet_name: str) -> dict:
+    """Schema metadata stored in columnar outputs."""
+    return {"sheet_name": sheet_name, "source_workbook": xlsx_path.name}
+
+
+def _local_name(tag: str) -> str:
+    """An XML tag or attribute name without its namespace."""
+    return tag.rsplit("}", 1)[-1]
+
+
+def _read_relationships(archive: zipfile.ZipFile, part: str) -> dict:
+    """Map relationship ids of an xlsx part to (type, target part path)."""
+    directory, name = posixpath.split(part)
+    rels_path = posixpath.join(directory, "_rels", f"{name}.rels")
+    if rels_path not in archive.namelist():
+        return {}
+    relationships = {}
+    for rel in ElementTree.fromstring(archive.read(rels_path)):
+        target = rel.get("Target", "")
+        if target.startswith("/"):
+            target = target[1:]
+        else:
+            target = posixpath.normpath(posixpath.join(directory, target))
+        relationships[rel.get("Id")] = (rel.get("Type", ""), target)
+    return relationships
+
+
+def workbook_sheet_parts(xlsx_path: Path) -> list[tuple[str, str]]:
+    """
+    Return (sheet name, XML part path) for each worksheet, in workbook order.
+
+    Only xl/workbook.xml and its relationships are read, so no sheet is parsed.
+    Chartsheets are left out, as they are from openpyxl's and pandas' sheet lists.
+    """
+    with zipfile.ZipFile(xlsx_path) as archive:
+        workbook_part = next(
+            (target for rel_type, target in _read_relationships(archive, "").values()
+             if rel_type.endswith("/officeDocument")),
+            "xl/workbook.xml",
+        )
+        relationships = _read_relationships(archive, workbook_part)
+        parts = set(archive.namelist())
+        sheets = []
+        for element in ElementTree.fromstring(archive.read(workbook_part)).iter():
+            if _local_name(element.tag) != "sheet":
+                continue
+            rel_id = next((value for key, value in element.attrib.items() if _local_name(key) == "id"), None)
+            rel_type, target = relationships.get(rel_id, ("", None))
+            if target in parts and "chartsheet" not in rel_type:
+                sheets.append((element.get("name"), target))
+        return sheets
+
+
+def open_read_only_workbook(xlsx_path: Path, sheet_names: list[str]):
+    """
+    Open a workbook with openpyxl in read-only mode, holding only `sheet_names`.
+
+    load_workbook(read_only=True) sizes every worksheet up front, which parses a
+    sheet's whole XML when it declares no <dimension> (as write-only files do).
+    Leaving unselected sheets out of the workbook means they are never read.
+    """
+    from openpyxl.reader.excel import ExcelReader
+    from openpyxl.workbook.defined_name import DefinedNameList
+    from openpyxl.worksheet._read_only import ReadOnlyWorksheet
+
+    wanted = set(sheet_names)
+
+    class SelectedSheetsReader(ExcelReader):
+        def read_worksheets(self):
+            for sheet, rel in self.parser.find_sheets():
+                if sheet.name in wanted and rel.target in self.valid_files and "chartsheet" not in rel.Type:
+                    worksheet = ReadOnlyWorksheet(self.wb, sheet.name, rel.target, self.shared_strings)
+                    worksheet.sheet_state = sheet.state
+                    self.wb._sheets.append(worksheet)
+            # Sheet-scoped names index the full sheet list; none of them affect cell values
+            self.parser.defined_names = DefinedNameList()
+
+    reader = SelectedSheetsReader(xlsx_path, read_only=True, data_only=True, keep_links=False)
+    reader.read()
+    return reader.wb
+
+
+def _cell_value(cell):
+    """Convert a read-only openpyxl cell the same way pandas' openpyxl reader does."""
+    value = cell.value
+    if value is None:
+        return None
+    if cell.data_type == "e":
+        # Error cells read as NaN: blank when written, but still data for the sheet extent
+        return float("nan")
+    if cell.data_type == "n":
+        as_int = int(value)
+        return as_int if as_int == value else float(value)
+    return value
+
+
+def _iter_sheet_rows(worksheet):
+    """Yield each row of a read-only worksheet as converted values, trailing blanks trimmed."""
+    for row in worksheet.rows:
+        values = [_cell_value(cell) for cell in row]
+        while values and values[-1] is None:
+            values.pop()
+        yield values
+
+
+def _classify(value):
+    """Classify a non-header cell value, returning (value_class, parsed_value)."""
+    if value is None:
+        return _NA, None
+    if isinstance(value, bool):
+        return _BOOL, value
+    if isinstance(value, int):
+        return (_INT if INT64_MIN <= value <= INT64_MAX else _BIGINT), value
+    if isinstance(value, float):
+        return (_NA, None) if value != value else (_FLOAT, value)
+    if isinstance(value, datetime.datetime):
+        return _DATETIME, value
+    if isinstance(value, str):
+        if value in NA_STRINGS:
+            return _NA, None
+        if value in BOOL_STRINGS:
+            return _BOOL_TEXT, BOOL_STRINGS[value]
+        if INT_PATTERN.fullmatch(value):
+            parsed = int(value)
+            return (_INT if INT64_MIN <= parsed <= INT64_MAX else _BIGINT), parsed
+        if FLOAT_PATTERN.fullmatch(value):
+            return _FLOAT, float(value)
+    return _TEXT, value
+
+
+class _ColumnProfile:
+    """Running summary of one column's value classes, built in a single pass."""
+
+    __slots__ = ("seen", "count", "has_microseconds", "has_sub_millisecond", "all_midnight")
+
+    def __init__(self):
+        self.seen = set()
+        self.count = 0
+        self.has_microseconds = False
+        self.has_sub_millisecond = False
+        self.all_midnight = True
+
+    def add(self, value):
+        value_class, parsed = _classify(value)
+        self.seen.add(value_class)
+        self.count += 1
+        if value_class == _DATETIME:
+            if parsed.microsecond:
+                self.has_microseconds = True
+                if parsed.microsecond % 1000:
+                    self.has_sub_millisecond = True
+            if parsed.hour or parsed.minute or parsed.second or parsed.microsecond:
+                self.all_midnight = False
+
+    def kind(self) -> int:
+        values = self.seen - {_NA}
+        if not values:
+            return KIND_EMPTY
+        if values == {_BOOL} or values == {_BOOL_TEXT}:
+            # Blanks turn boolean cells into floats but leave "TRUE"/"FALSE" text as bools
+            if _NA not in self.seen or values == {_BOOL_TEXT}:
+                return KIND_BOOL
+            return KIND_FLOAT
+        if values <= {_INT, _BIGINT, _FLOAT, _BOOL}:
+            if _FLOAT in values or _NA in self.seen:
+                return KIND_FLOAT
+            # Integers beyond int64 only fit an object column
+            return KIND_OBJECT if _BIGINT in values else KIND_INT
+        if values == {_DATETIME}:
+            return KIND_DATETIME
+        return KIND_OBJECT
+
+    def datetime_format(self) -> tuple[str, int]:
+        """Return (strftime format, trailing chars to drop) for a datetime column."""
+        if self.has_sub_millisecond:
+            return "%Y-%m-%d %H:%M:%S.%f", 0
+        if self.has_microseconds:
+            return "%Y-%m-%d %H:%M:%S.%f", 3
+        if self.all_midnight:
+            return "%Y-%m-%d", 0
+        return "%Y-%m-%d %H:%M:%S", 0
+
+
+def _formatter(kind: int, profile: _ColumnProfile):
+    """Return a function rendering one cell value as pandas' to_csv would for this column."""
+    if kind == KIND_EMPTY:
+        return lambda value: ""
+
+    if kind == KIND_INT:
+        def format_int(value):
+            return str(int(_classify(value)[1]))
+        return format_int
+
+    if kind == KIND_FLOAT:
+        def format_float(value):
+            parsed = _classify(value)[1]
+            return "" if parsed is None else repr(float(parsed))
+        return format_float
+
+    if kind == KIND_BOOL:
+        def format_bool(value):
+            parsed = _classify(value)[1]
+            return "" if parsed is None else str(parsed)
+        return format_bool
+
+    if kind == KIND_DATETIME:
+        fmt, trim = profile.datetime_format()
+
+        def format_datetime(value):
+            if not isinstance(value, datetime.datetime):
+                return ""
+            text = value.strftime(fmt)
+            return text[:-trim] if trim else text
+        return format_datetime
+
+    def format_object(value):
+        if _classify(value)[0] == _NA:
+            return ""
+        return str(value)
+    return format_object
+
+
+def _format_raw(value) -> str:
+    """Render a cell value as stored, with no NA detection or numeric coercion."""
+    if value is None or value != value:
+        return ""
+    return str(value)
+
+
+def _arrow_column(kind: int, raw: bool = False):
+    """Return (converter, pyarrow type) producing typed column values for a column kind."""
+    pa = require_pyarrow()
+    if raw:
+        return _format_raw, pa.string()
+    if kind == KIND_EMPTY:
+        return (lambda value: None), pa.float64()
+    if kind == KIND_INT:
+        return (lambda value: int(_classify(value)[1])), pa.int64()
+    if kind == KIND_FLOAT:
+        def convert_float(value):
+            parsed = _classify(value)[1]
+            return None if parsed is None else float(parsed)
+        return convert_float, pa.float64()
+    if kind == KIND_BOOL:
+        return (lambda value: _classify(value)[1]), pa.bool_()
+    if kind == KIND_DATETIME:
+        def convert_datetime(value):
+            return value if isinstance(value, datetime.datetime) else None
+        return convert_datetime, pa.timestamp("us")
+
+    def convert_object(value):
+        return None if _classify(value)[0] == _NA else str(value)
+    return convert_object, pa.string()
+
 
-try:
-    import pandas as pd
-except ImportError:
-    print("pandas not found. Installing...")
-    import subprocess
-    subprocess.check_call([sys.executable, "-m", "pip", "install", "pandas", "openpyxl"])
-    import pandas as pd
+class _CsvSink:
+    """Streaming CSV output for one sheet."""
 
+    def __init__(self, path: Path, names: list, formatters: list):
+        self.file = open(path, "w", newline="", encoding="utf-8")
+        self.writer = csv.writer(self.file, lineterminator=os.linesep)
+        self.writer.writerow(names)
+        self.formatters = formatters
+        self.convert_seconds = 0.0
+        self.write_seconds = 0.0
 
-def convert_xlsx_to_csv(xlsx_path: str, output_dir: str = None) -> list[str]:
+    def write(self, rows: list[list]) -> None:
+        formatters = self.formatters
+        started = time.perf_counter()
+        formatted = [[fmt(value) for fmt, value in zip(formatters, row)] for row in rows]
+        converted = time.perf_counter()
+        self.writer.writerows(formatted)
+        self.convert_seconds += converted - started
+        self.write_seconds += time.perf_counter() - converted
+
+    def close(self) -> None:
+        started = time.perf_counter()
+        self.file.close()
+        self.write_seconds += time.perf_counter() - started
+
+
+def _open_columnar_writer(path: Path, fmt: str, schema):
+    """Open a Parquet or Arrow IPC file writer; both take write_batch() and write_table()."""
+    pa = require_pyarrow()
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+        return pq.ParquetWriter(path, schema)
+    # Uncompressed IPC files can be memory-mapped without copying
+    return pa.ipc.new_file(path, schema)
+
+
+class _ArrowSink:
+    """Streaming Parquet or Arrow IPC output for one sheet, one row group/batch per chunk."""
+
+    def __init__(self, path: Path, fmt: str, names: list, columns: list, metadata: dict):
+        pa = require_pyarrow()
+        self.pa = pa
+        self.converters = [converter for converter, _ in columns]
+        self.schema = pa.schema(
+            [pa.field(name, arrow_type) for name, (_, arrow_type) in zip(names, columns)],
+            metadata=metadata,
+        )
+        self.writer = _open_columnar_writer(path, fmt, self.schema)
+        self.convert_seconds = 0.0
+        self.write_seconds = 0.0
+
+    def write(self, rows: list[list]) -> None:
+        if not rows:
+            return
+        started = time.perf_counter()
+        arrays = [
+            self.pa.array([convert(row[i]) for row in rows], type=field.type)
+            for i, (convert, field) in enumerate(zip(self.converters, self.schema))
+        ]
+        converted = time.perf_counter()
+        self.writer.write_batch(self.pa.record_batch(arrays, schema=self.schema))
+        self.convert_seconds += converted - started
+        self.write_seconds += time.perf_counter() - converted
+
+    def close(self) -> None:
+        started = time.perf_counter()
+        self.writer.close()
+        self.write_seconds += time.perf_counter() - started
+
+
+def _dedup_names(names: list) -> list:
+    """Mangle duplicate column names the way pandas does (a, a.1, a.2, ...)."""
+    counts = {}
+    result = []
+    for name in names:
+        cur_count = counts.get(name, 0)
+        if cur_count > 0:
+            while cur_count > 0:
+                counts[name] = cur_count + 1
+                name = f"{name}.{cur_count}"
+                cur_count = counts.get(name, 0)
+        result.append(name)
+        counts[name] = cur_count + 1
+    return result
+
+
+def write_sheet_streaming(
+    worksheet,
+    output_paths: dict,
+    chunk_size: int = STREAM_CHUNK_ROWS,
+    raw: bool = False,
+    metadata: dict = None,
+) -> dict:
+    """
+    Write one worksheet to CSV (and/or columnar files) without materializing it.
+
+    Makes two passes over the read-only row iterator: the first profiles each
+    column (so dtypes match what pd.read_excel would infer), the second formats
+    rows and flushes them to disk every `chunk_size` rows. Memory use depends on
+    the sheet's width and `chunk_size`, never on its row count.
+
+    Args:
+        worksheet: Read-only openpyxl worksheet
+        output_paths: Destination path per output format ("csv", "parquet", "arrow")
+        chunk_size: Number of rows buffered per write
+        raw: Write values as stored instead of as inferred dtypes (the first
+            pass then only measures the sheet)
+        metadata: Schema metadata for columnar outputs
+
+    Returns:
+        Dict with the sheet's "rows" and "columns" and the seconds spent in
+        "parse" (reading rows, both passes), "convert" (formatting values) and
+        "write" (writing outputs)
+    """
+    started = time.perf_counter()
+    worksheet.reset_dimensions()
+
+    # Pass 1: sheet extent and per-column value profiles
+    width = 0
+    last_row_with_data = -1
+    profiles: list[_ColumnProfile] = []
+    for row_number, values in enumerate(_iter_sheet_rows(worksheet)):
+        if values:
+            last_row_with_data = row_number
+            width = max(width, len(values))
+        if row_number == 0 or raw:
+            continue
+        while len(profiles) < len(values):
+            profiles.append(_ColumnProfile())
+        for profile, value in zip(profiles, values):
+            profile.add(value)
+
+    # Rows shorter than the widest row are padded with blanks
+    while len(profiles) < width:
+        profiles.append(_ColumnProfile())
+    for profile in profiles:
+        if profile.count < last_row_with_data:
+            profile.seen.add(_NA)
+
+    def open_sinks(names: list) -> None:
+        kinds = [p.kind() for p in profiles]
+        for fmt, path in output_paths.items():
+            if fmt == "csv":
+                if raw:
+                    formatters = [_format_raw] * len(names)
+                else:
+                    formatters = [_formatter(kind, p) for kind, p in zip(kinds, profiles)]
+                sinks.append(_CsvSink(path, names, formatters))
+            else:
+                columns = [_arrow_column(kind, raw) for kind in kinds]
+                sinks.append(_ArrowSink(path, fmt, names, columns, metadata or {}))
+
+    # Pass 2: format and write in bounded chunks
+    sinks = []
+    try:
+        if last_row_with_data < 0:
+            open_sinks([])
+            return {"rows": 0, "columns": 0, "parse": 0.0, "convert": 0.0, "write": 0.0}
+
+        chunk = []
+        for row_number, values in enumerate(_iter_sheet_rows(worksheet)):
+            if row_number > last_row_with_data:
+                break
+            values = values + [None] * (width - len(values))
+            if row_number == 0:
+                header = [
+                    f"Unnamed: {i}" if value is None else value
+                    for i, value in enumerate(values)
+                ]
+                open_sinks([str(name) for name in _dedup_names(header)])
+                continue
+            chunk.append(values)
+            if len(chunk) >= chunk_size:
+                for sink in sinks:
+                    sink.write(chunk)
+                chunk = []
+        for sink in sinks:
+            sink.write(chunk)
+    finally:
+        for sink in sinks:
+            sink.close()
+
+    convert_seconds = sum(sink.convert_seconds for sink in sinks)
+    write_seconds = sum(sink.write_seconds for sink in sinks)
+    return {
+        "rows": max(last_row_with_data, 0),
+        "columns": width,
+        "parse": time.perf_counter() - started - convert_seconds - write_seconds,
+        "convert": convert_seconds,
+        "write": write_seconds,
+    }
+
+
+def engine_available(engine: str) -> bool:
+    """Whether the reader backing a pandas Excel engine is importable."""
+    if engine == "calamine":
+        return importlib.util.find_spec("python_calamine") is not None
+    return engine == "openpyxl"
+
+
+def candidate_engines(engine: str, stream: bool = False, xlsx_path: Path = None) -> list[str]:
+    """
+    Engines to try for a workbook, in order.
+
+    Streaming always uses openpyxl's read-only iterator. calamine tries calamine
+    first (when installed) and falls back to openpyxl. auto does the same for
+    workbooks of at least AUTO_CALAMINE_MIN_BYTES and uses openpyxl for smaller
+    ones (or any workbook, when `xlsx_path` is not given).
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine {engine!r}; expected one of {', '.join(ENGINES)}")
+    if engine == "auto":
+        large = xlsx_path is not None and os.path.getsize(xlsx_path) >= AUTO_CALAMINE_MIN_BYTES
+        engine = "calamine" if large else "openpyxl"
+    if stream or engine == "openpyxl":
+        return ["openpyxl"]
+    return [e for e in ("calamine", "openpyxl") if engine_available(e)]
+
+
+def preload_readers(engines=("calamine", "openpyxl"), stream: bool = False, formats=()) -> None:
+    """
+    Import the readers (and writers) a conversion will use up front.
+
+    Warm workers call this before their first job, and timed conversions before
+    starting the clock, so one-time import cost is not charged to a workbook.
+    """
+    if not stream:
+        require_pandas()
+    import openpyxl  # noqa: F401
+    if "calamine" in engines and engine_available("calamine"):
+        import python_calamine  # noqa: F401
+    if "parquet" in formats:
+        import pyarrow.parquet  # noqa: F401
+
+
+def peak_rss_mb() -> float | None:
+    """Peak resident set size of this process so far, in MiB (None where unsupported)."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS and KiB elsewhere
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def _sheet_stats(sheet_name: str, rows: int, columns: int, seconds: dict, output_paths: list[str]) -> dict:
+    """Per-sheet performance record used in run reports."""
+    total = sum(seconds.values())
+    return {
+        "sheet": sheet_name,
+        "rows": rows,
+        "columns": columns,
+        "bytes_written": sum(os.path.getsize(path) for path in output_paths),
+        "seconds": {phase: round(value, 6) for phase, value in seconds.items()},
+        "total_seconds": round(total, 6),
+        "rows_per_sec": round(rows / total, 1) if total else None,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def _columnar_frame(df, raw: bool = False):
+    """
+    Prepare a sheet DataFrame for pyarrow.
+
+    Column names become strings, and object columns mixing value types or
+    holding integers beyond int64 (which pyarrow cannot store) fall back to
+    their CSV text. In raw mode every column is stored as text.
+    """
+    frame = df.copy(deep=False)
+    frame.columns = [str(name) for name in df.columns]
+    for name in frame.columns:
+        column = frame[name]
+        if raw:
+            frame[name] = column.map(_format_raw).astype(object)
+        elif column.dtype == object:
+            value_types = {type(value) for value in column if not pd.isna(value)}
+            # Integers only stay object when pandas could not fit them in int64
+            if len(value_types) > 1 or int in value_types:
+                frame[name] = column.map(lambda value: None if pd.isna(value) else str(value)).astype(object)
+    return frame
+
+
+def _arrow_table(df, metadata: dict, raw: bool = False):
+    """
+    Build a pyarrow Table from a sheet DataFrame, keeping dtypes and sheet metadata.
+
+    Text and datetime columns are cast to the types the streaming writer uses
+    (see _arrow_column), so a sheet's schema does not depend on --stream or on
+    the pandas version (pandas 3 strings arrive as large_string, pandas 2
+    datetimes as nanoseconds).
+    """
+    pa = require_pyarrow()
+    table = pa.Table.from_pandas(_columnar_frame(df, raw), preserve_index=False)
+    fields = []
+    for field in table.schema:
+        if pa.types.is_large_string(field.type):
+            field = field.with_type(pa.string())
+        elif pa.types.is_timestamp(field.type):
+            field = field.with_type(pa.timestamp("us"))
+        fields.append(field)
+    schema = pa.schema(fields, metadata={**(table.schema.metadata or {}), **metadata})
+    return table.cast(schema)
+
+
+def _write_columnar(table, path: Path, fmt: str) -> None:
+    """Write a pyarrow Table as Parquet or Arrow IPC."""
+    with _open_columnar_writer(path, fmt, table.schema) as writer:
+        writer.write_table(table)
+
+
+def _time_calls(target, method_names: tuple[str, ...], total: list) -> None:
+    """Wrap methods of `target` so the seconds spent in them add up in total[0]."""
+    def timed(method):
+        def call(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                total[0] += time.perf_counter() - started
+        return call
+
+    for name in method_names:
+        setattr(target, name, timed(getattr(target, name)))
+
+
+def _convert_sheets_pandas(
+    xlsx_path: Path,
+    output_dir: Path,
+    sheet_names: list[str],
+    engine: str,
+    raw: bool = False,
+    formats: tuple[str, ...] = DEFAULT_FORMATS,
+    include_sheets: list[str] = None,
+    exclude_sheets: list[str] = None,
+    stats: dict = None,
+) -> list[str]:
+    """
+    Convert sheets by loading each into a DataFrame with the given pandas engine.
+
+    If `stats` is given, "open" seconds, the workbook's "sheet_names" and
+    per-sheet entries under "sheets" are recorded. "parse" covers the reader
+    pulling cell values out of the sheet, "convert" the rest of read_excel (NA
+    detection and dtype inference) plus building Arrow tables, and "write"
+    to_csv (which formats values as it writes) and columnar writes.
+    """
+    # Get base name without extension
+    base_name = xlsx_path.stem
+
+    # Raw mode keeps every cell as an object and skips NA detection and dtype inference
+    read_options = {"dtype": object, "na_filter": False} if raw else {}
+
+    require_pandas()
+    started = time.perf_counter()
+    if engine == "openpyxl":
+        # Hand pandas a workbook holding only the selected sheets, so the others are never parsed
+        workbook_sheets = [name for name, _ in workbook_sheet_parts(xlsx_path)]
+        sheet_names = select_sheets(workbook_sheets if sheet_names is None else sheet_names,
+                                    include_sheets, exclude_sheets)
+        source = open_read_only_workbook(xlsx_path, sheet_names)
+    else:
+        source = xlsx_path
+    with pd.ExcelFile(source, engine=engine) as xlsx:
+        if engine != "openpyxl":
+            # calamine lists sheets from workbook metadata and loads each one on demand
+            workbook_sheets = xlsx.sheet_names
+            sheet_names = select_sheets(workbook_sheets if sheet_names is None else sheet_names,
+                                        include_sheets, exclude_sheets)
+        parse_seconds = [0.0]
+        if stats is not None:
+            stats["open"] += time.perf_counter() - started
+            stats["sheet_names"] = workbook_sheets
+            # Separate the reader's cell extraction from read_excel's inference
+            _time_calls(xlsx._reader, ("get_sheet_by_name", "get_sheet_data"), parse_seconds)
+
+        created_files = []
+
+        for sheet_name in sheet_names:
+            # Read the sheet
+            parse_seconds[0] = 0.0
+            started = time.perf_counter()
+            df = pd.read_excel(xlsx, sheet_name=sheet_name, **read_options)
+            read_seconds = time.perf_counter() - started
+            seconds = {"parse": parse_seconds[0], "convert": read_seconds - parse_seconds[0], "write": 0.0}
+
+            sheet_files = []
+            table = None
+            for fmt in formats:
+                # Create output filename: basename__sheetname.csv
+                output_path = sheet_output_path(output_dir, base_name, sheet_name, fmt)
+
+                if fmt == "csv":
+                    started = time.perf_counter()
+                    df.to_csv(output_path, index=False)
+                else:
+                    if table is None:
+                        started = time.perf_counter()
+                        table = _arrow_table(df, sheet_metadata(xlsx_path, sheet_name), raw)
+                        seconds["convert"] += time.perf_counter() - started
+                    started = time.perf_counter()
+                    _write_columnar(table, output_path, fmt)
+                seconds["write"] += time.perf_counter() - started
+                sheet_files.append(str(output_path))
+                print(f"  Created: {output_path.name}")
+
+            if stats is not None:
+                rows, columns = df.shape
+                stats["sheets"].append(_sheet_stats(sheet_name, rows, columns, seconds, sheet_files))
+            created_files.extend(sheet_files)
+
+    return created_files
+
+
+def _convert_sheets_streaming(
+    xlsx_path: Path,
+    output_dir: Path,
+    sheet_names: list[str],
+    chunk_size: int,
+    raw: bool = False,
+    formats: tuple[str, ...] = DEFAULT_FORMATS,
+    include_sheets: list[str] = None,
+    exclude_sheets: list[str] = None,
+    stats: dict = None,
+) -> list[str]:
+    """
+    Convert sheets through openpyxl's read-only row iterator.
+
+    Fills `stats` like _convert_sheets_pandas; see write_sheet_streaming for
+    how the phases split.
+    """
+    base_name = xlsx_path.stem
+    started = time.perf_counter()
+    workbook_sheets = [name for name, _ in workbook_sheet_parts(xlsx_path)]
+    sheet_names = select_sheets(workbook_sheets if sheet_names is None else sheet_names,
+                                include_sheets, exclude_sheets)
+    workbook = open_read_only_workbook(xlsx_path, sheet_names)
+    if stats is not None:
+        stats["open"] += time.perf_counter() - started
+        stats["sheet_names"] = workbook_sheets
+    created_files = []
+    try:
+        for worksheet in (workbook[name] for name in sheet_names):
+            output_paths = {
+                fmt: sheet_output_path(output_dir, base_name, worksheet.title, fmt)
+                for fmt in formats
+            }
+            sheet = write_sheet_streaming(
+                worksheet,
+                output_paths,
+                chunk_size,
+                raw=raw,
+                metadata=sheet_metadata(xlsx_path, worksheet.title),
+            )
+            sheet_files = [str(output_path) for output_path in output_paths.values()]
+            for output_path in output_paths.values():
+                print(f"  Created: {output_path.name}")
+            if stats is not None:
+                seconds = {phase: sheet[phase] for phase in ("parse", "convert", "write")}
+                stats["sheets"].append(
+                    _sheet_stats(worksheet.title, sheet["rows"], sheet["columns"], seconds, sheet_files)
+                )
+            created_files.extend(sheet_files)
+    finally:
+        workbook.close()
+    return created_files
+
+
+def convert_xlsx_to_csv(
+    xlsx_path: str,
+    output_dir: str = None,
+    stream: bool = False,
+    chunk_size: int = STREAM_CHUNK_ROWS,
+    sheet_names: list[str] = None,
+    engine: str = DEFAULT_ENGINE,
+    raw: bool = False,
+    formats: tuple[str, ...] = DEFAULT_FORMATS,
+    include_sheets: list[str] = None,
+    exclude_sheets: list[str] = None,
+    details: dict = None,
+) -> list[str]:
     """
     Convert an Excel file to CSV(s), one per sheet.
 
     Args:
         xlsx_path: Path to the .xlsx file
         output_dir: Directory for output CSVs (defaults to same directory as xlsx)
+        stream: Read rows lazily and write in bounded chunks instead of loading
+            each sheet into a DataFrame (output is identical for ordinary sheets)
+        chunk_size: Rows buffered per write when streaming
+        sheet_names: Only convert these sheets (defaults to every sheet, in workbook order)
+        engine: Reader to use: "openpyxl", "calamine" or "auto" (calamine for
+            large workbooks, see candidate_engines). Falls back to openpyxl when
+            calamine is not installed or cannot read the workbook
+        raw: Write cell values as stored (text verbatim, integral numbers without
+            ".0", blanks empty) instead of pandas' inferred dtypes
+        formats: Outputs to write per sheet: any of "csv", "parquet", "arrow"
+            (comma-separated string or sequence)
+        include_sheets: Only convert sheets matching one of these patterns
+            (case-insensitive globs, or regexes prefixed with "re:")
+        exclude_sheets: Skip sheets matching any of these patterns
+        details: If given, filled with facts about the conversion: "engine"
+            (the reader that produced the output), "engines" (the readers it
+            was to try, in order), "open_seconds",
+            "total_seconds", "sheet_names" (every worksheet in the workbook,
+            converted or not) and "sheets" (per-sheet rows, columns, bytes written,
+            parse/convert/write seconds, rows/sec and peak RSS). Timing is only
+            collected when details is passed
 
     Returns:
-        List of created CSV file paths
+        List of created file paths
     """
     xlsx_path = Path(xlsx_path)
+    formats = parse_formats(formats)
+    if formats != ("csv",):
+        require_pyarrow()
     if output_dir is None:
         output_dir = xlsx_path.parent
     else:
         output_dir = Path(output_dir)
         output_dir.mkdir(parents=True, exist_ok=True)
 
-    # Get base name without extension
-    base_name = xlsx_path.stem
+    engines = candidate_engines(engine, stream, xlsx_path)
+    if engine == "calamine" and not engine_available("calamine"):
+        print("  calamine reader not installed (pip install python-calamine); using openpyxl")
+    if details is not None:
+        # The first workbook in a process would otherwise be charged for these
+        preload_readers(engines, stream, formats)
+    conversion_started = time.perf_counter()
+    for attempt, candidate in enumerate(engines):
+        stats = {"open": 0.0, "sheets": []} if details is not None else None
+        try:
+            if stream:
+                created_files = _convert_sheets_streaming(
+                    xlsx_path, output_dir, sheet_names, chunk_size, raw=raw, formats=formats,
+                    include_sheets=include_sheets, exclude_sheets=exclude_sheets, stats=stats,
+                )
+            else:
+                created_files = _convert_sheets_pandas(
+                    xlsx_path, output_dir, sheet_names, candidate, raw=raw, formats=formats,
+                    include_sheets=include_sheets, exclude_sheets=exclude_sheets, stats=stats,
+                )
+        except Exception as e:
+            if attempt == len(engines) - 1:
+                raise
+            print(f"  {candidate} failed ({e}); retrying with {engines[attempt + 1]}")
+            continue
+        break
 
-    # Read all sheets
-    xlsx = pd.ExcelFile(xlsx_path)
-    sheet_names = xlsx.sheet_names
+    if not created_files and (include_sheets or exclude_sheets):
+        print("  No sheets matched the sheet filters")
+    if engine != DEFAULT_ENGINE:
+        print(f"  Engine: {candidate}")
+    if details is not None:
+        details["engine"] = candidate
+        details["engines"] = engines
+        details["open_seconds"] = round(stats["open"], 6)
+        details["total_seconds"] = round(time.perf_counter() - conversion_started, 6)
+        details["sheets"] = stats["sheets"]
+        details["sheet_names"] = stats["sheet_names"]
+    return created_files
 
-    created_files = []
 
-    for sheet_name in sheet_names:
-        # Read the sheet
-        df = pd.read_excel(xlsx, sheet_name=sheet_name)
+MANIFEST_NAME = ".xlsx-to-csv-manifest.json"
+MANIFEST_VERSION = 1
 
-        # Create output filename: basename__sheetname.csv
-        # Sanitize sheet name for filename
-        safe_sheet_name = sheet_name.replace("/", "-").replace("\\", "-").replace(" ", "_")
-        csv_filename = f"{base_name}__{safe_sheet_name}.csv"
-        csv_path = output_dir / csv_filename
+# Options that change how a conversion runs but not what it writes
+NON_OUTPUT_OPTIONS = {"xlsx_path", "stream", "chunk_size", "output_dir", "details"}
 
-        # Write CSV
-        df.to_csv(csv_path, index=False)
-        created_files.append(str(csv_path))
-        print(f"  Created: {csv_path.name}")
 
-    return created_files
+def _file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
 
 
-def process_directory(directory: str) -> dict:
+def _output_options(convert_kwargs: dict) -> dict:
+    """
+    The subset of conversion options that affects output, in canonical JSON form.
+
+    Options are bound against convert_xlsx_to_csv's defaults, so a caller passing
+    the defaults explicitly (the CLI) and one omitting them (--serve jobs, API
+    callers) share manifest entries.
+    """
+    bound = inspect.signature(convert_xlsx_to_csv).bind(None, **convert_kwargs)
+    bound.apply_defaults()
+    options = {k: v for k, v in bound.arguments.items() if k not in NON_OUTPUT_OPTIONS}
+    options["formats"] = sorted(parse_formats(options["formats"]))
+    for key in ("include_sheets", "exclude_sheets"):
+        # Patterns are alternatives, so order and repeats do not matter
+        options[key] = sorted(set(options[key])) if options[key] else None
+    return json.loads(json.dumps(options, sort_keys=True, default=str))
+
+
+class ConversionManifest:
+    """
+    Record of previous conversions for one output folder.
+
+    Each source workbook maps to its size, mtime, SHA-256 and the outputs it
+    produced (with their own size/mtime). A workbook is up to date when its stat
+    matches, or its stat changed but its hash did not, and every recorded output
+    is still on disk untouched. Outputs of earlier runs that the latest run did
+    not rewrite but whose sheet still exists (CSVs after a --format parquet run,
+    sheets left out by --sheets) are listed under "kept" so they can still be
+    cleaned up later.
+    """
+
+    def __init__(self, output_dir: Path):
+        self.output_dir = Path(output_dir)
+        self.path = self.output_dir / MANIFEST_NAME
+        self.entries = {}
+        self.dirty = False
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == MANIFEST_VERSION:
+                self.entries = data.get("files", {})
+        except (OSError, ValueError):
+            pass
+
+    def _key(self, xlsx_path: Path) -> str:
+        return os.path.relpath(xlsx_path, self.output_dir)
+
+    def _source_path(self, key: str) -> Path:
+        return self.output_dir / key
+
+    def current_outputs(self, xlsx_path: Path, options: dict, engines: list[str]) -> list[str] | None:
+        """
+        Return the recorded outputs if `xlsx_path` needs no conversion, else None.
+
+        `engines` are the readers a conversion would try now (see
+        candidate_engines). Readers differ in output (calamine blanks
+        whitespace-only text), so the outputs only count when the recorded
+        reader is the one that would run first, or was the fallback among the
+        same readers.
+        """
+        entry = self.entries.get(self._key(xlsx_path))
+        if entry is None or entry.get("options") != options:
+            return None
+        if entry.get("engine") != engines[0] and entry.get("engines") != engines:
+            return None
+
+        stat = xlsx_path.stat()
+        if stat.st_size != entry["size"]:
+            return None
+        if stat.st_mtime_ns != entry["mtime_ns"]:
+            # Touched but possibly unchanged: fall back to the content hash
+            if _file_sha256(xlsx_path) != entry["sha256"]:
+                return None
+            entry["mtime_ns"] = stat.st_mtime_ns
+            self.dirty = True
+
+        outputs = []
+        for name, recorded in entry["outputs"].items():
+            output_path = self.output_dir / name
+            try:
+                output_stat = output_path.stat()
+            except OSError:
+                return None
+            if (output_stat.st_size, output_stat.st_mtime_ns) != (recorded["size"], recorded["mtime_ns"]):
+                return None
+            outputs.append(str(output_path))
+        return outputs
+
+    def record(
+        self,
+        xlsx_path: Path,
+        created: list[str],
+        options: dict,
+        sheet_names: list[str],
+        engine: str = None,
+        engines: list[str] = None,
+    ) -> list[str]:
+        """
+        Record a successful conversion and delete outputs of removed sheets.
+
+        `sheet_names` are the workbook's current sheets; previous outputs of any
+        of them (in any format) are kept even if this run did not write them,
+        since sheet filters and --format only limit what a run writes. `engine`
+        notes which reader produced the outputs and `engines` the readers that
+        were to be tried.
+
+        Returns:
+            List of stale output paths that were removed
+        """
+        key = self._key(xlsx_path)
+        previous = self.entries.get(key, {})
+        previous_outputs = {**previous.get("kept", {}), **previous.get("outputs", {})}
+        stat = xlsx_path.stat()
+        outputs = {}
+        for output_path in map(Path, created):
+            output_stat = output_path.stat()
+            outputs[os.path.relpath(output_path, self.output_dir)] = {
+                "size": output_stat.st_size,
+                "mtime_ns": output_stat.st_mtime_ns,
+            }
+        self.entries[key] = {
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "sha256": _file_sha256(xlsx_path),
+            "options": options,
+            "engine": engine,
+            "engines": engines,
+            "outputs": outputs,
+        }
+        self.dirty = True
+
+        current = {
+            os.path.relpath(sheet_output_path(self.output_dir, xlsx_path.stem, sheet_name, fmt), self.output_dir)
+            for sheet_name in sheet_names
+            for fmt in OUTPUT_FORMATS
+        }
+        stale = []
+        kept = {}
+        for name, recorded in previous_outputs.items():
+            if name in outputs:
+                continue
+            if name not in current:
+                stale.append(name)
+            elif (self.output_dir / name).exists():
+                kept[name] = recorded
+        if kept:
+            self.entries[key]["kept"] = kept
+        return self._remove_outputs(stale)
+
+    def forget(self, xlsx_path: Path) -> None:
+        """
+        Mark a workbook's entry out of date so it is reconverted next time.
+
+        Its outputs stay recorded, so a later run can still delete those of
+        removed sheets (or all of them with --prune).
+        """
+        entry = self.entries.get(self._key(xlsx_path))
+        if entry is not None and entry.get("sha256") is not None:
+            entry["sha256"] = None
+            entry["options"] = None
+            self.dirty = True
+
+    def prune_missing_sources(self) -> list[str]:
+        """Delete outputs of workbooks that no longer exist and drop their entries."""
+        removed = []
+        for key in list(self.entries):
+            if not self._source_path(key).exists():
+                entry = self.entries.pop(key)
+                removed += self._remove_outputs([*entry["outputs"], *entry.get("kept", {})])
+                self.dirty = True
+        return removed
+
+    def _remove_outputs(self, names) -> list[str]:
+        removed = []
+        for name in names:
+            output_path = self.output_dir / name
+            try:
+                output_path.unlink()
+                removed.append(str(output_path))
+            except FileNotFoundError:
+                pass
+        return removed
+
+    def save(self) -> None:
+        if not self.dirty:
+            return
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": MANIFEST_VERSION, "files": self.entries}, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+        self.dirty = False
+
+
+def list_sheets(xlsx_path: str) -> list[dict]:
+    """
+    Describe a workbook's worksheets without reading any cell data.
+
+    Dimensions come from each sheet's declared <dimension> element, which can
+    include formatted-but-empty cells; they are None when a sheet omits it.
+    Each sheet's XML is read only up to the start of <sheetData>.
+
+    Returns:
+        List of dicts with "name", "dimension" (e.g. "A1:F200"), "rows" and "columns"
+    """
+    from openpyxl.utils.cell import range_boundaries
+
+    sheets = []
+    with zipfile.ZipFile(xlsx_path) as archive:
+        for name, part in workbook_sheet_parts(xlsx_path):
+            dimension = None
+            with archive.open(part) as source:
+                for _, element in ElementTree.iterparse(source, events=("start",)):
+                    tag = _local_name(element.tag)
+                    if tag == "dimension":
+                        dimension = element.get("ref")
+                    elif tag == "sheetData":
+                        break
+            try:
+                min_col, min_row, max_col, max_row = range_boundaries(dimension)
+            except (TypeError, ValueError):
+                min_col = min_row = max_col = max_row = None
+            sized = None not in (min_col, min_row, max_col, max_row)
+            sheets.append({
+                "name": name,
+                "dimension": dimension if sized else None,
+                "rows": max_row - min_row + 1 if sized else None,
+                "columns": max_col - min_col + 1 if sized else None,
+            })
+    return sheets
+
+
+def list_sheet_names(xlsx_path: str) -> list[str]:
+    """Return the worksheet names of a workbook without reading any sheet."""
+    return [name for name, _ in workbook_sheet_parts(xlsx_path)]
+
+
+def print_sheet_listing(xlsx_files: list[Path], include: list[str] = None, exclude: list[str] = None) -> None:
+    """Print the (filtered) sheets of each workbook with their declared dimensions."""
+    for xlsx_file in xlsx_files:
+        print(f"{xlsx_file}")
+        try:
+            sheets = list_sheets(xlsx_file)
+        except Exception as e:
+            print(f"  ERROR: {e}")
+            continue
+        selected = set(select_sheets([sheet["name"] for sheet in sheets], include, exclude))
+        for sheet in sheets:
+            if sheet["name"] not in selected:
+                continue
+            if sheet["dimension"] is None:
+                size = "size unknown"
+            else:
+                size = f"{sheet['rows']} rows x {sheet['columns']} cols ({sheet['dimension']})"
+            print(f"  {sheet['name']}: {size}")
+
+
+def _convert_task(xlsx_path: str, sheet_names: list[str], convert_kwargs: dict) -> tuple[list[str], str, str, dict]:
+    """
+    Run convert_xlsx_to_csv in a worker process.
+
+    Output is captured so the parent can print it in a stable order.
+
+    Returns:
+        Tuple of (created CSV paths, captured output, error message or None, details)
+    """
+    output = io.StringIO()
+    details = {}
+    try:
+        with contextlib.redirect_stdout(output):
+            created = convert_xlsx_to_csv(
+                xlsx_path, sheet_names=sheet_names, details=details, **convert_kwargs
+            )
+        return created, output.getvalue(), None, details
+    except Exception as e:
+        return [], output.getvalue(), str(e), details
+
+
+def _merge_details(target: dict, source: dict) -> None:
+    """
+    Fold one task's details into a workbook's: lists are merged without repeats
+    (every task reports the same "sheet_names"), numbers add, other values join.
+    """
+    for key, value in source.items():
+        if isinstance(value, list):
+            merged = target.setdefault(key, [])
+            merged.extend(item for item in value if item not in merged)
+        elif isinstance(value, (int, float)) and not isinstance(value, bool) and key in target:
+            target[key] = round(target[key] + value, 6)
+        elif target.setdefault(key, value) != value:
+            target[key] = ",".join(sorted(set(str(target[key]).split(",")) | {str(value)}))
+
+
+def convert_files_parallel(
+    xlsx_files: list[Path],
+    jobs: int,
+    split_sheets: bool = False,
+    label=str,
+    details: dict = None,
+    **convert_kwargs,
+) -> dict:
+    """
+    Convert workbooks across a pool of worker processes.
+
+    Every task is submitted up front, then results are collected in the order of
+    `xlsx_files` so printed output and the returned dict do not depend on which
+    worker finishes first. A failing workbook (or sheet) is reported and mapped to
+    an empty list without affecting the others.
+
+    Args:
+        xlsx_files: Workbooks to convert
+        jobs: Number of worker processes
+        split_sheets: Submit one task per sheet instead of one per workbook
+        label: Function giving the display name printed for each workbook
+        details: If given, filled with each workbook's conversion details, keyed by path
+        **convert_kwargs: Options forwarded to convert_xlsx_to_csv
+
+    Returns:
+        Dict mapping xlsx files to their created CSVs
+    """
+    results = {}
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = {}
+        for xlsx_file in xlsx_files:
+            sheet_groups = [None]
+            if split_sheets:
+                try:
+                    sheet_names = select_sheets(
+                        list_sheet_names(xlsx_file),
+                        convert_kwargs.get("include_sheets"),
+                        convert_kwargs.get("exclude_sheets"),
+                    )
+                    # An empty group still runs once so the worker reports the empty match
+                    sheet_groups = [[name] for name in sheet_names] or [[]]
+                except Exception:
+                    # Let the worker hit (and report) the same error
+                    pass
+            futures[xlsx_file] = [
+                pool.submit(_convert_task, str(xlsx_file), sheets, convert_kwargs)
+                for sheets in sheet_groups
+            ]
+
+        for xlsx_file in xlsx_files:
+            print(f"Processing: {label(xlsx_file)}")
+            created = []
+            errors = []
+            file_details = {}
+            for future in futures[xlsx_file]:
+                try:
+                    task_created, output, error, task_details = future.result()
+                except Exception as e:
+                    # The worker itself died (e.g. BrokenProcessPool)
+                    task_created, output, error, task_details = [], "", str(e) or type(e).__name__, {}
+                print(output, end="")
+                created.extend(task_created)
+                _merge_details(file_details, task_details)
+                if error is not None:
+                    errors.append(error)
+            for error in errors:
+                print(f"  ERROR: {error}")
+            if errors:
+                file_details["error"] = "; ".join(errors)
+            results[str(xlsx_file)] = [] if errors else created
+            if details is not None:
+                details[str(xlsx_file)] = file_details
+
+    return results
+
+
+def process_directory(
+    directory: str,
+    jobs: int = None,
+    split_sheets: bool = False,
+    force: bool = False,
+    prune: bool = False,
+    details: dict = None,
+    **convert_kwargs,
+) -> dict:
     """
     Process all xlsx files in a directory (recursively).
 
+    Workbooks whose manifest entry shows them unchanged are skipped unless
+    `force` is set. Outputs of removed sheets are deleted; outputs of removed
+    workbooks only when `prune` is set.
+
+    Args:
+        directory: Folder to search for .xlsx files
+        jobs: Worker processes to use (defaults to the CPU count; 1 converts in-process)
+        split_sheets: Spread the sheets of each workbook across workers too
+        force: Reconvert every workbook regardless of the manifest
+        prune: Delete the outputs of workbooks no longer in the folder
+        details: If given, filled with each workbook's conversion details (see
+            convert_xlsx_to_csv) plus a "status" of ok, skipped or error and
+            "manifest_seconds" (checking and recording it in the manifest,
+            including hashing)
+        **convert_kwargs: Options forwarded to convert_xlsx_to_csv
+
     Returns:
         Dict mapping xlsx files to their created CSVs
     """
     directory = Path(directory)
-    xlsx_files = list(directory.glob("**/*.xlsx"))
+    xlsx_files = sorted(directory.glob("**/*.xlsx"))
+
+    # One manifest per output folder (with `prune`, also those whose workbooks are all gone)
+    manifests = {}
+
+    def manifest_for(output_dir: Path) -> ConversionManifest:
+        if output_dir not in manifests:
+            manifests[output_dir] = ConversionManifest(output_dir)
+        return manifests[output_dir]
+
+    def output_dir_for(xlsx_file: Path) -> Path:
+        output_dir = convert_kwargs.get("output_dir")
+        return Path(output_dir) if output_dir is not None else xlsx_file.parent
+
+    options = _output_options(convert_kwargs)
+    engine = convert_kwargs.get("engine", DEFAULT_ENGINE)
+    stream = convert_kwargs.get("stream", False)
+    results = {}
+    pending = []
+    manifest_seconds = {}
+    for xlsx_file in xlsx_files:
+        outputs = None
+        if not force:
+            started = time.perf_counter()
+            engines = candidate_engines(engine, stream, xlsx_file)
+            outputs = manifest_for(output_dir_for(xlsx_file)).current_outputs(xlsx_file, options, engines)
+            manifest_seconds[str(xlsx_file)] = time.perf_counter() - started
+        if outputs is None:
+            pending.append(xlsx_file)
+        else:
+            results[str(xlsx_file)] = outputs
+
+    removed = []
+    if prune:
+        if convert_kwargs.get("output_dir") is None:
+            for manifest_path in directory.glob(f"**/{MANIFEST_NAME}"):
+                manifest_for(manifest_path.parent)
+        else:
+            manifest_for(Path(convert_kwargs["output_dir"]))
+        for manifest in manifests.values():
+            removed += manifest.prune_missing_sources()
 
     if not xlsx_files:
         print(f"No .xlsx files found in {directory}")
-        return {}
+    else:
+        print(f"Found {len(xlsx_files)} Excel files\n")
+        if results:
+            print(f"Skipping {len(results)} unchanged files\n")
 
-    print(f"Found {len(xlsx_files)} Excel files\n")
+    if jobs is None:
+        jobs = os.cpu_count() or 1
 
-    results = {}
-    for xlsx_file in sorted(xlsx_files):
-        print(f"Processing: {xlsx_file.relative_to(directory)}")
+    file_details = {}
+    if pending and jobs > 1:
+        results.update(convert_files_parallel(
+            pending,
+            jobs,
+            split_sheets=split_sheets,
+            label=lambda xlsx_file: xlsx_file.relative_to(directory),
+            details=file_details,
+            **convert_kwargs,
+        ))
+    else:
+        for xlsx_file in pending:
+            print(f"Processing: {xlsx_file.relative_to(directory)}")
+            file_detail = file_details[str(xlsx_file)] = {}
+            try:
+                created = convert_xlsx_to_csv(xlsx_file, details=file_detail, **convert_kwargs)
+                results[str(xlsx_file)] = created
+            except Exception as e:
+                print(f"  ERROR: {e}")
+                file_detail["error"] = str(e)
+                results[str(xlsx_file)] = []
+
+    for xlsx_file in pending:
+        started = time.perf_counter()
+        manifest = manifest_for(output_dir_for(xlsx_file))
+        file_detail = file_details.get(str(xlsx_file), {})
+        if "error" not in file_detail:
+            # Includes workbooks where no sheet matched the filters
+            try:
+                removed += manifest.record(
+                    xlsx_file,
+                    results[str(xlsx_file)],
+                    options,
+                    file_detail["sheet_names"],
+                    engine=file_detail.get("engine"),
+                    engines=file_detail.get("engines"),
+                )
+            except OSError as e:
+                # The workbook or an output was replaced or removed since it was converted
+                print(f"  ERROR: could not record {xlsx_file.relative_to(directory)}: {e}")
+                file_detail["error"] = str(e)
+        if "error" in file_detail:
+            manifest.forget(xlsx_file)
+        manifest_seconds[str(xlsx_file)] = manifest_seconds.get(str(xlsx_file), 0.0) + time.perf_counter() - started
+    for manifest in manifests.values():
+        manifest.save()
+
+    for path in removed:
+        print(f"  Removed stale: {Path(path).name}")
+
+    if details is not None:
+        for xlsx_file in xlsx_files:
+            file_detail = file_details.get(str(xlsx_file))
+            bookkeeping = {"manifest_seconds": round(manifest_seconds.get(str(xlsx_file), 0.0), 6)}
+            if file_detail is None:
+                details[str(xlsx_file)] = {"status": "skipped", **bookkeeping}
+            else:
+                status = "error" if "error" in file_detail else "ok"
+                details[str(xlsx_file)] = {"status": status, **file_detail, **bookkeeping}
+
+    return {str(xlsx_file): results[str(xlsx_file)] for xlsx_file in xlsx_files}
+
+
+def build_run_report(results: dict, details: dict, wall_seconds: float, options: dict = None) -> dict:
+    """
+    Assemble the machine-readable run report written by --report.
+
+    Args:
+        results: Workbook -> created files, as returned by process_directory
+        details: Workbook -> conversion details, as filled by process_directory
+        wall_seconds: Elapsed time for the whole run
+        options: Conversion options to record alongside the timings
+
+    Returns:
+        JSON-serializable dict with per-file (and per-sheet) records and run totals
+    """
+    files = []
+    for xlsx_file, created in results.items():
+        detail = details.get(xlsx_file, {})
+        sheets = detail.get("sheets", [])
+        rows = sum(sheet["rows"] for sheet in sheets)
+        total_seconds = detail.get("total_seconds")
+        files.append({
+            "path": xlsx_file,
+            "status": detail.get("status", "ok"),
+            "engine": detail.get("engine"),
+            "error": detail.get("error"),
+            "outputs": len(created),
+            "open_seconds": detail.get("open_seconds"),
+            "total_seconds": total_seconds,
+            "manifest_seconds": detail.get("manifest_seconds"),
+            "rows": rows,
+            "bytes_written": sum(sheet["bytes_written"] for sheet in sheets),
+            "rows_per_sec": round(rows / total_seconds, 1) if total_seconds else None,
+            "peak_rss_mb": max((sheet["peak_rss_mb"] or 0 for sheet in sheets), default=None),
+            "sheets": sheets,
+        })
+
+    statuses = [f["status"] for f in files]
+    total_rows = sum(f["rows"] for f in files)
+    peaks = [f["peak_rss_mb"] for f in files if f["peak_rss_mb"]] + [peak_rss_mb() or 0]
+    return {
+        "generated_at": datetime.datetime.now().isoformat(timespec="seconds"),
+        "options": json.loads(json.dumps(options or {}, default=str)),
+        "totals": {
+            "files": len(files),
+            "converted": statuses.count("ok"),
+            "skipped": statuses.count("skipped"),
+            "failed": statuses.count("error"),
+            "sheets": sum(len(f["sheets"]) for f in files),
+            "rows": total_rows,
+            "bytes_written": sum(f["bytes_written"] for f in files),
+            "manifest_seconds": round(sum(f["manifest_seconds"] or 0 for f in files), 6),
+            "wall_seconds": round(wall_seconds, 6),
+            "rows_per_sec": round(total_rows / wall_seconds, 1) if wall_seconds else None,
+            "peak_rss_mb": max(peaks),
+        },
+        "files": files,
+    }
+
+
+def write_run_report(report: dict, report_path: str) -> None:
+    report_path = Path(report_path)
+    report_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(report_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+        f.write("\n")
+    print(f"Report written: {report_path}")
+
+
+def print_slowest_sheets(report: dict, top: int) -> None:
+    """Print the `top` slowest sheets of a run report as a table."""
+    sheets = [
+        (Path(f["path"]).name, sheet)
+        for f in report["files"]
+        for sheet in f["sheets"]
+    ]
+    sheets.sort(key=lambda item: item[1]["total_seconds"], reverse=True)
+    if not sheets:
+        return
+
+    print(f"\nSlowest {min(top, len(sheets))} sheets:")
+    print(f"  {'total s':>8} {'parse':>8} {'convert':>8} {'write':>8} {'rows':>9} {'cols':>5} "
+          f"{'rows/s':>10} {'MB out':>7}  sheet")
+    for workbook, sheet in sheets[:top]:
+        seconds = sheet["seconds"]
+        rows_per_sec = sheet["rows_per_sec"] or 0
+        print(
+            f"  {sheet['total_seconds']:>8.3f} {seconds['parse']:>8.3f} {seconds['convert']:>8.3f} "
+            f"{seconds['write']:>8.3f} {sheet['rows']:>9} {sheet['columns']:>5} {rows_per_sec:>10.0f} "
+            f"{sheet['bytes_written'] / 1e6:>7.2f}  {workbook} / {sheet['sheet']}"
+        )
+
+
+# Keyword options a --serve job may set, and which of them only apply to folders
+JOB_OPTIONS = {
+    "output_dir", "stream", "chunk_size", "sheet_names", "engine", "raw", "formats",
+    "include_sheets", "exclude_sheets", "jobs", "split_sheets", "force", "prune",
+}
+DIRECTORY_OPTIONS = {"jobs", "split_sheets", "force", "prune"}
+JOB_ALIASES = {"sheets": "include_sheets"}
+
+WATCH_INTERVAL = 1.0
+
+
+def run_job(job: dict) -> dict:
+    """
+    Run one --serve job and build its JSON-serializable response.
+
+    A job converts `path` (a workbook or a folder) with any conversion options it
+    carries; folders go through process_directory, so they are incremental.
+
+    Returns:
+        Dict with the job's "id", "ok", "results" (workbook -> created files) or
+        "error", and "log" (the output a CLI run would have printed)
+    """
+    response = {"id": job.get("id")}
+    op = job.get("op", "convert")
+    if op in ("ping", "shutdown"):
+        return {**response, "ok": True}
+
+    output = io.StringIO()
+    try:
+        if op != "convert":
+            raise ValueError(f"Unknown op {op!r}")
+        if "path" not in job:
+            raise ValueError("Job is missing 'path'")
+        options = {
+            JOB_ALIASES.get(key, key): value
+            for key, value in job.items()
+            if key not in ("id", "op", "path")
+        }
+        unknown = set(options) - JOB_OPTIONS
+        if unknown:
+            raise ValueError(f"Unknown job option(s): {', '.join(sorted(unknown))}")
+
+        input_path = Path(job["path"])
+        with contextlib.redirect_stdout(output):
+            if input_path.is_dir():
+                results = process_directory(input_path, **options)
+            elif input_path.is_file():
+                file_options = {k: v for k, v in options.items() if k not in DIRECTORY_OPTIONS}
+                results = {str(input_path): convert_xlsx_to_csv(input_path, **file_options)}
+            else:
+                raise FileNotFoundError(f"Path does not exist: {input_path}")
+        response.update(ok=True, results=results)
+    except Exception as e:
+        response.update(ok=False, error=str(e))
+    response["log"] = output.getvalue()
+    return response
+
+
+def _handle_job_line(line: str) -> tuple[dict, bool]:
+    """Parse and run one JSON job line; returns (response, shutdown requested)."""
+    try:
+        job = json.loads(line)
+        if not isinstance(job, dict):
+            raise ValueError("Job must be a JSON object")
+    except ValueError as e:
+        return {"id": None, "ok": False, "error": f"Invalid job: {e}"}, False
+    return run_job(job), job.get("op") == "shutdown"
+
+
+def serve_stdio() -> None:
+    """Serve JSON-line jobs from stdin until EOF or a shutdown op."""
+    preload_readers()
+    print("xlsx-to-csv worker ready", file=sys.stderr, flush=True)
+    stdout = sys.stdout
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        response, shutdown = _handle_job_line(line)
+        stdout.write(json.dumps(response, default=str) + "\n")
+        stdout.flush()
+        if shutdown:
+            break
+
+
+class _JobSocketHandler(socketserver.StreamRequestHandler):
+    """Reads JSON-line jobs from one client connection and answers each in turn."""
+
+    def handle(self):
+        for raw_line in self.rfile:
+            line = raw_line.decode("utf-8")
+            if not line.strip():
+                continue
+            # Jobs capture stdout, so they run one at a time across connections
+            with self.server.job_lock:
+                response, shutdown = _handle_job_line(line)
+            self.wfile.write((json.dumps(response, default=str) + "\n").encode("utf-8"))
+            self.wfile.flush()
+            if shutdown:
+                threading.Thread(target=self.server.shutdown, daemon=True).start()
+                return
+
+
+def _remove_stale_socket(socket_path: Path) -> None:
+    """
+    Remove a socket left behind by a worker that exited without cleaning up.
+
+    Raises:
+        FileExistsError: If the path is not a socket, or a worker still listens on it
+    """
+    try:
+        mode = socket_path.lstat().st_mode
+    except FileNotFoundError:
+        return
+    if not S_ISSOCK(mode):
+        raise FileExistsError(f"{socket_path} exists and is not a socket")
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
         try:
-            created = convert_xlsx_to_csv(xlsx_file)
-            results[str(xlsx_file)] = created
-        except Exception as e:
-            print(f"  ERROR: {e}")
-            results[str(xlsx_file)] = []
+            probe.connect(str(socket_path))
+        except ConnectionRefusedError:
+            socket_path.unlink()
+            return
+    raise FileExistsError(f"A worker is already listening on {socket_path}")
 
-    return results
+
+def serve_socket(socket_path: str) -> None:
+    """Serve JSON-line jobs on a Unix socket until a shutdown op or Ctrl+C."""
+    socket_path = Path(socket_path)
+    _remove_stale_socket(socket_path)
+    preload_readers()
+    with socketserver.ThreadingUnixStreamServer(str(socket_path), _JobSocketHandler) as server:
+        server.daemon_threads = True
+        server.job_lock = threading.Lock()
+        print(f"xlsx-to-csv worker listening on {socket_path}", file=sys.stderr, flush=True)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            socket_path.unlink(missing_ok=True)
+
+
+def _xlsx_snapshot(directory: Path) -> dict:
+    """Size and mtime of every workbook under a folder, ignoring Excel lock files."""
+    snapshot = {}
+    for xlsx_file in directory.glob("**/*.xlsx"):
+        if xlsx_file.name.startswith("~$"):
+            continue
+        try:
+            stat = xlsx_file.stat()
+        except OSError:
+            continue
+        snapshot[str(xlsx_file)] = (stat.st_size, stat.st_mtime_ns)
+    return snapshot
+
+
+def watch_directory(directory: str, interval: float = WATCH_INTERVAL, **process_kwargs) -> None:
+    """
+    Reconvert a folder whenever its workbooks change, until Ctrl+C.
+
+    Polls workbook sizes and mtimes every `interval` seconds and runs
+    process_directory once a change has held steady for a full poll, so files
+    still being written are not picked up half-saved. The manifest means only
+    the changed workbooks are actually reconverted.
+
+    Args:
+        directory: Folder to watch
+        interval: Seconds between polls
+        **process_kwargs: Options forwarded to process_directory
+    """
+    directory = Path(directory)
+    preload_readers()
+    print(f"Watching {directory} (Ctrl+C to stop)\n")
+    converted = None
+    previous = _xlsx_snapshot(directory)
+    try:
+        while True:
+            snapshot = _xlsx_snapshot(directory)
+            if snapshot != converted and snapshot == previous:
+                process_directory(directory, **process_kwargs)
+                print(f"\n{'='*50}\nWaiting for changes...\n", flush=True)
+                converted = snapshot
+            previous = snapshot
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        print("Stopped watching")
+
+
+def _formats_arg(value: str) -> tuple[str, ...]:
+    try:
+        return parse_formats(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def parse_args(argv: list[str] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Convert Excel workbooks to CSV files, one per sheet.")
+    parser.add_argument("path", nargs="?", help="Folder or .xlsx file (defaults to data/test-data)")
+    parser.add_argument("--stream", action="store_true",
+                        help="Read rows lazily and write in bounded chunks (constant memory; "
+                             "reads each sheet twice, so roughly 1.5x slower)")
+    parser.add_argument("--chunk-size", type=int, default=STREAM_CHUNK_ROWS,
+                        help=f"Rows buffered per write in --stream mode (default {STREAM_CHUNK_ROWS})")
+    parser.add_argument("--jobs", "-j", type=int, default=os.cpu_count() or 1,
+                        help="Worker processes (default: CPU count; 1 disables the pool)")
+    parser.add_argument("--split-sheets", action="store_true",
+                        help="Spread the sheets of each workbook across workers")
+    parser.add_argument("--force", action="store_true",
+                        help="Reconvert every workbook, ignoring the incremental manifest")
+    parser.add_argument("--prune", action="store_true",
+                        help="Delete outputs of workbooks removed from the folder")
+    parser.add_argument("--engine", choices=ENGINES, default=DEFAULT_ENGINE,
+                        help="Excel reader; auto uses calamine for large workbooks when installed, "
+                             "and calamine falls back to openpyxl")
+    parser.add_argument("--raw", action="store_true",
+                        help="Write cell values as stored, skipping type inference (lossless for codes)")
+    parser.add_argument("--sheets", dest="include_sheets", action="append", metavar="PATTERN",
+                        help='Only convert sheets matching PATTERN (glob, or regex prefixed with "re:"); repeatable')
+    parser.add_argument("--exclude-sheets", dest="exclude_sheets", action="append", metavar="PATTERN",
+                        help="Skip sheets matching PATTERN; repeatable")
+    parser.add_argument("--list", action="store_true",
+                        help="List sheets and their declared dimensions without converting")
+    parser.add_argument("--watch", action="store_true",
+                        help="Keep running and reconvert the folder when workbooks change")
+    parser.add_argument("--interval", type=float, default=WATCH_INTERVAL,
+                        help=f"Seconds between --watch polls (default {WATCH_INTERVAL})")
+    parser.add_argument("--serve", action="store_true",
+                        help="Run a warm worker that reads JSON-line jobs from stdin")
+    parser.add_argument("--socket", metavar="PATH",
+                        help="Run a warm worker that accepts JSON-line jobs on a Unix socket")
+    parser.add_argument("--format", dest="formats", type=_formats_arg, default=DEFAULT_FORMATS,
+                        help="Comma-separated outputs: csv, parquet, arrow (default: csv)")
+    parser.add_argument("--report", metavar="PATH",
+                        help="Write per-file and per-sheet timings to a JSON report")
+    parser.add_argument("--top", type=int, default=None, metavar="N",
+                        help="Print the N slowest sheets (default: 10 with --report)")
+    args = parser.parse_args(argv)
+    if args.top is not None and args.top < 0:
+        parser.error("--top must be 0 or more")
+    if args.top is None:
+        args.top = 10 if args.report else 0
+    return args
 
 
 def main():
+    args = parse_args()
+
+    if args.socket:
+        try:
+            serve_socket(args.socket)
+        except FileExistsError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+        return
+    if args.serve:
+        serve_stdio()
+        return
+
     # Determine input path
-    if len(sys.argv) > 1:
-        input_path = sys.argv[1]
+    if args.path:
+        input_path = args.path
     else:
         # Default to data/test-data
         script_dir = Path(__file__).parent
@@ -114,21 +1907,83 @@ def main():
         print(f"Error: Path does not exist: {input_path}")
         sys.exit(1)
 
+    convert_kwargs = {
+        "stream": args.stream,
+        "chunk_size": args.chunk_size,
+        "engine": args.engine,
+        "raw": args.raw,
+        "formats": args.formats,
+        "include_sheets": args.include_sheets,
+        "exclude_sheets": args.exclude_sheets,
+    }
+
+    if args.list:
+        xlsx_files = [input_path] if input_path.is_file() else sorted(input_path.glob("**/*.xlsx"))
+        print_sheet_listing(xlsx_files, args.include_sheets, args.exclude_sheets)
+        return
+
+    if args.watch:
+        if not input_path.is_dir():
+            print(f"Error: --watch needs a folder: {input_path}")
+            sys.exit(1)
+        watch_directory(
+            input_path,
+            interval=args.interval,
+            jobs=args.jobs,
+            split_sheets=args.split_sheets,
+            prune=args.prune,
+            **convert_kwargs,
+        )
+        return
+
+    # Timings are only gathered when something will report them
+    details = {} if args.report or args.top else None
+    started = time.perf_counter()
+
     if input_path.is_file():
         if input_path.suffix.lower() != ".xlsx":
             print(f"Error: Not an Excel file: {input_path}")
             sys.exit(1)
         print(f"Processing single file: {input_path}")
-        convert_xlsx_to_csv(input_path)
+        file_details = {} if details is not None else None
+        if args.split_sheets and args.jobs > 1:
+            created = convert_files_parallel(
+                [input_path], args.jobs, split_sheets=True, details=file_details, **convert_kwargs
+            )[str(input_path)]
+            file_details = (file_details or {}).get(str(input_path))
+        else:
+            created = convert_xlsx_to_csv(input_path, details=file_details, **convert_kwargs)
+        if details is not None:
+            file_details = file_details or {}
+            details[str(input_path)] = {"status": "error" if "error" in file_details else "ok", **file_details}
+        results = {str(input_path): created}
     else:
-        results = process_directory(input_path)
+        results = process_directory(
+            input_path,
+            jobs=args.jobs,
+            split_sheets=args.split_sheets,
+            force=args.force,
+            prune=args.prune,
+            details=details,
+            **convert_kwargs,
+        )
 
         # Summary
-        total_csvs = sum(len(v) for v in results.values())
+        outputs = [path for v in results.values() for path in v]
+        total_csvs = sum(1 for path in outputs if path.endswith(".csv"))
         successful = sum(1 for v in results.values() if v)
         print(f"\n{'='*50}")
         print(f"Summary: {successful}/{len(results)} files converted")
         print(f"Total CSVs created: {total_csvs}")
+        if len(outputs) > total_csvs:
+            print(f"Total columnar files created: {len(outputs) - total_csvs}")
+
+    if details is not None:
+        report = build_run_report(results, details, time.perf_counter() - started, convert_kwargs)
+        if args.top:
+            print_slowest_sheets(report, args.top)
+        if args.report:
+            write_run_report(report, args.report)
 
 
 if __name__ == "__main__":